@@ -3,10 +3,12 @@ import pytz
 from datetime import datetime
 import tkinter as tk
 from tkinter import ttk, messagebox
+from clock_engine import SYSTEM_CLOCK
 
 class WorldClockApp:
-    def __init__(self, root):
+    def __init__(self, root, clock=SYSTEM_CLOCK):
         self.root = root
+        self.clock = clock
         self.root.title("World Clock")
         self.root.geometry("500x400")
         self.root.resizable(True, True)
@@ -138,13 +140,13 @@ class WorldClockApp:
                 # Get the timezone
                 tz = pytz.timezone(tz_name)
                 # Get current time in the timezone
-                current_time = datetime.now(tz)
+                current_time = datetime.fromtimestamp(self.clock.time(), tz)
                 # Format according to the configured format
                 formatted_time = current_time.strftime(self.config["datetime_format"])
                 data["label"].config(text=formatted_time)
             except Exception as e:
                 # Fallback if any error occurs
-                current_time = time.strftime("%H:%M:%S\n%d-%m-%Y")
+                current_time = time.strftime("%H:%M:%S\n%d-%m-%Y", time.localtime(self.clock.time()))
                 data["label"].config(text=current_time)
         
         # Schedule the next update
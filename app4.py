@@ -1,7 +1,8 @@
 import re
 import tkinter as tk
-from tkinter import ttk, messagebox, font
+from tkinter import ttk, messagebox, font, simpledialog
 import time
+import copy
 import ctypes
 import json
 import os
@@ -11,98 +12,405 @@ from PIL import Image, ImageDraw
 import pystray
 from pystray import MenuItem
 import threading
+import queue
 import pytz
-from datetime import datetime
+from clock_metrics import Metrics
+from clock_cities import open_index
+from clock_engine import FALLBACK_FORMAT, REFRESH_RATES, SYSTEM_CLOCK, WINDOW_DEFAULTS, ClockHealth, ClockRenderer, OffsetClock, ZoneRenderer, default_config, fill_defaults, frame_boundary, time_scale_names
+from clock_server import ClockServer
+from clock_dst import TransitionLookahead, describe
+from clock_draft import ConfigDraft
+from clock_ntp import NtpMonitor, format_estimate
+from clock_planner import DAY_MINUTES, MeetingPlanner
+from clock_shm import TickBufferWriter
+from clock_timers import ALARM, COUNTDOWN, REMINDER, Stopwatch, TimerScheduler, format_elapsed
+from clock_layout import ROW_PADDING, TextMetrics, label_padding, reserved_text_size, stack_size
 
 WS_EX_TRANSPARENT = 0x20
 WS_EX_LAYERED = 0x80000
 GWL_EXSTYLE = -20
+COMMAND_POLL_MS = 50
+
+# Tick pipeline run states: visible renders and schedules to the next boundary,
+# hidden only keeps rendering for an enabled shared tick buffer, suspended schedules nothing
+RUN_VISIBLE = "visible"
+RUN_HIDDEN = "hidden"
+RUN_SUSPENDED = "suspended"
+STATUS_FONT = ("Segoe UI", 10, "bold")
+# Longest single wait for the next timer, so a suspend or clock step can't strand an alarm
+MAX_TIMER_WAIT_MS = 3600000
+STOPWATCH_LAPS_SHOWN = 3
+
+# While ticks are further apart than this, a watchdog still checks for clock steps and resumes
+HEALTH_CHECK_MS = 10000
+# Corrections smaller than this are not worth re-aiming the tick for
+NTP_APPLY_THRESHOLD = 0.001
+PLANNER_CELL_MINUTES = 30
+PLANNER_CELL_SIZE = (8, 14)
+# Slider motion is coalesced to one preview render per frame; the slider spans a week either way
+SCRUB_FRAME_MS = 16
+SCRUB_RANGE_MINUTES = 7 * 1440
+# Keyboard scrubbing has no release to end on; live time returns this long after the last key
+SCRUB_KEY_HOLD_MS = 1500
+SCRUB_HINT = "Drag or use the arrow keys to preview every zone; release to return to live time"
+TRAY_TITLE = "Desktop Clock"
+# Upcoming clock changes listed in the tray tooltip, which Windows cuts at 128 characters
+DST_TOOLTIP_LINES = 3
+TOOLTIP_LIMIT = 127
+# Zones not held by any profile are saved under this name before switching away from them
+UNSAVED_PROFILE = "Default"
+
+
+class MONITORINFO(ctypes.Structure):
+    _fields_ = [
+        ("cbSize", ctypes.c_ulong),
+        ("rcMonitor", ctypes.c_long * 4),
+        ("rcWork", ctypes.c_long * 4),
+        ("dwFlags", ctypes.c_ulong)
+    ]
+
+
+def get_monitors(root):
+    # (x, y, width, height) of every monitor, primary first; falls back to Tk's primary screen
+    monitors = []
+    try:
+        user32 = ctypes.windll.user32
+        callback_type = ctypes.WINFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p,
+                                           ctypes.POINTER(ctypes.c_long * 4), ctypes.c_void_p)
+
+        def callback(monitor, dc, rect, data):
+            info = MONITORINFO()
+            info.cbSize = ctypes.sizeof(MONITORINFO)
+            if user32.GetMonitorInfoW(ctypes.c_void_p(monitor), ctypes.byref(info)):
+                left, top, right, bottom = info.rcMonitor
+                primary = info.dwFlags & 1
+                monitors.append((not primary, (left, top, right - left, bottom - top)))
+            return 1
+
+        user32.EnumDisplayMonitors(None, None, callback_type(callback), 0)
+    except (AttributeError, OSError):
+        pass
+    if not monitors:
+        return [(0, 0, root.winfo_screenwidth(), root.winfo_screenheight())]
+    return [rect for _, rect in sorted(monitors, key=lambda m: m[0])]
+
+
+class OverlayWindow:
+    # One click-through overlay; `settings` is the config dict holding its position keys
+    def __init__(self, app, window, settings, title):
+        self.app = app
+        self.window = window
+        self.settings = settings
+        self.title = title
+        self.window.title(title)
+        self.window.overrideredirect(True)
+        self.window.wm_attributes("-topmost", True)
+        self.window.wm_attributes("-transparentcolor", "black")
+        
+        self.clock_frame = tk.Frame(self.window, bg="black")
+        self.clock_frame.pack()
+        # Extra lines (timers, ...) below the zones, packed only while there is something to show
+        self.status_label = tk.Label(self.window, font=STATUS_FONT, fg="white", bg="black", justify="left")
+        self.status_text = ""
+        
+        self.labels = {}
+        self.zone_indexes = []
+        self.padding = (0, 0)
+        self.reserved = None
+        self.position_x = settings.get("position_x", 50)
+        self.position_y = settings.get("position_y", 50)
+    
+    def zone_names(self):
+        return self.settings.get("zones")
+    
+    def create_timezone_labels(self, zones):
+        # Only this set: the frame also holds the labels of compiled profiles
+        for index, label in self.zone_indexes:
+            label.destroy()
+        self.labels = {}
+        self.zone_indexes = []
+        self.use_labels(self.build_labels(zones, self.app.renderers))
+    
+    def build_labels(self, zones, renderers):
+        # Labels for one zone set, created but not gridded, with the size "stable" layout reserves
+        # for them; profiles keep theirs ready to swap in
+        labels = {}
+        zone_indexes = []
+        wanted = self.zone_names()
+        for index, tz_config in enumerate(zones):
+            tz_name = tz_config["name"]
+            if wanted is not None and tz_name not in wanted:
+                continue
+            label = tk.Label(
+                self.clock_frame, 
+                font=(tz_config["font_family"], tz_config["font_size"], "bold"),
+                fg=tz_config.get("color", "white"), 
+                bg="black"
+            )
+            labels[tz_name] = label
+            zone_indexes.append((index, label))
+        return labels, zone_indexes, self.reserved_size(zones, renderers, zone_indexes)
+    
+    def use_labels(self, label_set):
+        for index, label in self.zone_indexes:
+            label.grid_remove()
+        self.labels, self.zone_indexes, reserved = label_set
+        self.shown = {}
+        for row, (index, label) in enumerate(self.zone_indexes):
+            label.grid(row=row, column=0, sticky="w", pady=2)
+        if self.zone_indexes:
+            self.padding = label_padding(self.zone_indexes[0][1])
+        self.apply_reserved(reserved)
+    
+    def reserve_layout(self):
+        self.apply_reserved(self.reserved_size(self.app.config["timezones"], self.app.renderers, self.zone_indexes))
+    
+    def reserved_size(self, zones, renderers, zone_indexes):
+        # "stable" layout: size the frame once for the widest text each format can produce,
+        # so digit width changes never propagate geometry up to the toplevel
+        if self.settings.get("layout", "auto") != "stable" or not zone_indexes:
+            return None
+        pad_x, pad_y = label_padding(zone_indexes[0][1])
+        width = height = 0
+        now = self.app.clock.time()
+        for index, label in zone_indexes:
+            tz_config = zones[index]
+            renderer = renderers[index]
+            text_width, text_height = reserved_text_size(
+                self.app.text_metrics, tz_config["font_family"], tz_config["font_size"], "bold",
+                renderer.format if renderer.valid else FALLBACK_FORMAT, renderer.sample_render,
+                renderer.layout_samples(now)
+            )
+            width = max(width, text_width + pad_x)
+            height += text_height + pad_y + ROW_PADDING
+        return width, height
+    
+    def apply_reserved(self, reserved):
+        self.reserved = reserved
+        if reserved is None:
+            self.clock_frame.grid_propagate(True)
+            return
+        width, height = reserved
+        self.clock_frame.config(width=width, height=height)
+        self.clock_frame.grid_propagate(False)
+    
+    def restyle(self, changed):
+        # Zones edited in place keep their labels; only font and colour are pushed to them
+        zones = self.app.config["timezones"]
+        for index, label in self.zone_indexes:
+            keys = changed.get(index)
+            if not keys:
+                continue
+            tz_config = zones[index]
+            if keys & {"font_family", "font_size"}:
+                label.config(font=(tz_config["font_family"], tz_config["font_size"], "bold"))
+            if "color" in keys:
+                label.config(fg=tz_config.get("color", "white"))
+            self.shown.pop(index, None)
+        self.reserve_layout()
+    
+    def show(self, texts):
+        # At frame rate only the zone with a sub-second field changes; leave the other labels alone
+        for index, label in self.zone_indexes:
+            text = texts[index]
+            if self.shown.get(index) != text:
+                label.config(text=text)
+                self.shown[index] = text
+    
+    def set_status(self, text):
+        # Returns True when the window size changes and needs repositioning
+        if text == self.status_text:
+            return False
+        resized = text.count("\n") != self.status_text.count("\n") or not text or not self.status_text
+        if text and not self.status_text:
+            self.status_label.pack(anchor="w")
+        elif not text:
+            self.status_label.pack_forget()
+        self.status_label.config(text=text)
+        self.status_text = text
+        return resized
+    
+    def setup_clock(self):
+        self.window.update_idletasks()
+        hwnd = ctypes.windll.user32.FindWindowW(None, self.window.title())
+        if hwnd:
+            self.app.make_window_clickthrough(hwnd)
+    
+    def measure(self):
+        if self.reserved:
+            width, height = self.reserved
+        else:
+            zones = self.app.config["timezones"]
+            rows = []
+            for index, label in self.zone_indexes:
+                tz_config = zones[index]
+                rows.append((tz_config["font_family"], tz_config["font_size"], "bold", label.cget("text")))
+            width, height = stack_size(self.app.text_metrics, rows, self.padding)
+        if self.status_text:
+            status_width, status_height = stack_size(
+                self.app.text_metrics, [STATUS_FONT + (self.status_text,)], label_padding(self.status_label)
+            )
+            width, height = max(width, status_width), height + status_height - ROW_PADDING
+        return width, height
+    
+    def update_position(self):
+        if self.settings["position"] == "custom":
+            x, y = self.settings["custom_x"], self.settings["custom_y"]
+        else:
+            monitors = get_monitors(self.window)
+            monitor = self.settings.get("monitor", 0)
+            left, top, screen_width, screen_height = monitors[monitor if 0 <= monitor < len(monitors) else 0]
+            
+            # Size comes from font metrics of the current label text, so no layout pass is forced
+            window_width, window_height = self.measure()
+            
+            taskbar_margin = 40
+            side_margin = 10
+            
+            positions = {
+                "topleft": (side_margin, side_margin),
+                "topright": (screen_width - window_width - side_margin, side_margin),
+                "bottomleft": (side_margin, screen_height - window_height - taskbar_margin),
+                "bottomright": (screen_width - window_width - side_margin, screen_height - window_height - taskbar_margin),
+                "center": ((screen_width - window_width) // 2, (screen_height - window_height) // 2)
+            }
+            
+            x, y = positions.get(self.settings["position"], (50, 50))
+            x, y = x + left, y + top
+        
+        self.window.geometry(f"+{x}+{y}")
+        self.position_x = x
+        self.position_y = y
+        self.settings["position_x"] = x
+        self.settings["position_y"] = y
+    
+    def set_visible(self, visible):
+        if visible:
+            self.window.deiconify()
+        else:
+            self.window.withdraw()
+
 
 class DesktopClock:
-    def __init__(self):
+    def __init__(self, clock=SYSTEM_CLOCK):
+        self.clock = clock
         self.config_file = "clock_config.json"
         self.box_geometry ="500x440"
         self.position_x = 50
         self.position_y = 50
         self.lock_file = "App.lock"
+        self.commands = queue.Queue()
+        self.metrics = Metrics()
         self.load_config()
         
         self.root = tk.Tk()
-        self.root.overrideredirect(True)
-        self.root.wm_attributes("-topmost", True)
-        self.root.wm_attributes("-transparentcolor", "black")
+        self.text_metrics = TextMetrics(self.root)
+        self.windows = []
+        self.create_windows()
         
-        self.clock_frame = tk.Frame(self.root, bg="black")
-        self.clock_frame.pack()
-        
-        self.labels = {}
+        self.tick_buffer = None
+        self.tick_job = None
+        self.tick_interval = None
+        self.health_job = None
+        self.clock_health = ClockHealth(self.clock)
+        self.timers = TimerScheduler(self.clock)
+        self.timer_job = None
+        self.shown_countdowns = []
+        self.next_timer = None
+        self.stopwatch = Stopwatch(self.clock)
+        self.status_lines = {}
+        # Status lines only reposition the windows once they have been placed
+        self.positioned = False
+        self.run_state = RUN_VISIBLE
+        self.setup_tick_buffer()
         self.create_timezone_labels()
         
         self.settings_window = None
+        self.draft = None
+        self.timezone_rows = []
+        self.planner_window = None
+        self.scrub_window = None
+        self.scrub_offset = None
+        self.scrub_job = None
+        self.scrub_hold_job = None
+        # Mapped on first use of the add-timezone search, not at startup
+        self.city_index = None
+        # Inactive profiles, compiled in idle time: name -> (renderers, label set per window), where a
+        # label set is (labels, zone indexes, reserved size)
+        self.compiled_profiles = {}
+        self.pending_profiles = []
+        self.profile_job = None
         self.tray_icon = None
+        self.server = None
+        self.ntp = None
+        # Rendering reads this clock: the injected one plus the NTP correction when "apply" is on.
+        # Health checks and timers stay on the raw clock, so applying a correction is not a step
+        self.rendered_clock = OffsetClock(self.clock)
+        self.dst = None
+        self.dst_job = None
+        self.dst_notified = set()
         self.running = True
         
+        self.setup_timers()
         self.update_time()
         self.setup_clock()
+        self.update_position()
+        self.positioned = True
         
-        self.root.after(100, self.update_position)
-        
+        self.setup_command_queue()
         self.setup_tray()
+        self.setup_server()
+        self.setup_ntp()
+        self.setup_dst()
+        self.setup_profiles()
         
         self.root.protocol("WM_DELETE_WINDOW", self.hide_window)
     
+    def create_windows(self):
+        # The root is the primary overlay and keeps the top-level position keys;
+        # each entry in config["windows"] adds a Toplevel with its own position/monitor/zones
+        for window in self.windows[1:]:
+            window.window.destroy()
+        self.windows = [OverlayWindow(self, self.root, self.config, self.root.title())]
+        for i, settings in enumerate(self.config["windows"]):
+            for key, value in WINDOW_DEFAULTS.items():
+                settings.setdefault(key, value)
+            toplevel = tk.Toplevel(self.root)
+            toplevel.protocol("WM_DELETE_WINDOW", self.hide_window)
+            self.windows.append(OverlayWindow(self, toplevel, settings, f"Desktop Clock {i + 2}"))
+    
     def create_timezone_labels(self):
-        for widget in self.clock_frame.winfo_children():
-            widget.destroy()
-        
-        self.labels = {}
+        self.renderers = [ZoneRenderer(tz_config) for tz_config in self.config["timezones"]]
+        for window in self.windows:
+            window.create_timezone_labels(self.config["timezones"])
+        self.zones_changed()
+    
+    def zones_changed(self):
+        self.subsecond_shown = any(
+            self.renderers[index].animated for window in self.windows for index, label in window.zone_indexes
+        )
         
-        for i, tz_config in enumerate(self.config["timezones"]):
-            tz_name = tz_config["name"]
-            label = tk.Label(
-                self.clock_frame, 
-                font=(tz_config["font_family"], tz_config["font_size"], "bold"),
-                fg=tz_config.get("color", "white"), 
-                bg="black"
-            )
-            label.grid(row=i, column=0, sticky="w", pady=2)
-            self.labels[tz_name] = label
+        if self.tick_buffer:
+            self.tick_buffer.set_names(renderer.name for renderer in self.renderers)
+    
+    def setup_tick_buffer(self):
+        settings = self.config["shared_buffer"]
+        if not settings["enabled"]:
+            return
+        try:
+            self.tick_buffer = TickBufferWriter(settings["path"] or None)
+        except (OSError, ValueError) as e:
+            print(f"Error creating shared tick buffer: {e}")
     
     def load_config(self):
-        default_config = {
-            "position": "topleft",
-            "custom_x": 50,
-            "custom_y": 50,
-            "visible": True,
-            "position_x": 50,
-            "position_y": 50,
-            "timezones": [
-                {
-                    "name": "Local",
-                    "timezone": "local",
-                    "font_family": "Segoe UI",
-                    "font_size": 12,
-                    "datetime_format": "%H:%M:%S\n%d-%m-%Y",
-                    "color": "white"
-                }
-            ]
-        }
-        
         try:
             with open(self.config_file, 'r') as f:
-                self.config = json.load(f)
-            for key, value in default_config.items():
-                if key not in self.config:
-                    self.config[key] = value
-            for tz in self.config["timezones"]:
-                for key, value in default_config["timezones"][0].items():
-                    if key not in tz:
-                        tz[key] = value
+                self.config = fill_defaults(json.load(f))
         except json.JSONDecodeError:
-            self.config = default_config
+            self.config = default_config()
             self.save_config()
         except FileNotFoundError:
-            self.config = default_config
+            self.config = default_config()
             self.save_config()
     
     def save_config(self):
@@ -113,10 +421,8 @@ class DesktopClock:
             print(f"Error saving config: {e}")
     
     def setup_clock(self):
-        self.root.update_idletasks()
-        hwnd = ctypes.windll.user32.FindWindowW(None, self.root.title())
-        if hwnd:
-            self.make_window_clickthrough(hwnd)
+        for window in self.windows:
+            window.setup_clock()
     
     def make_window_clickthrough(self, hwnd):
         styles = ctypes.windll.user32.GetWindowLongW(hwnd, GWL_EXSTYLE)
@@ -124,67 +430,220 @@ class DesktopClock:
                                             styles | WS_EX_TRANSPARENT | WS_EX_LAYERED)
     
     def update_time(self):
-        if self.running:
-            for tz_config in self.config["timezones"]:
-                tz_name = tz_config["name"]
-                if tz_name not in self.labels:
-                    continue
-                try:
-                    if tz_config["timezone"] == "local":
-                        current_time = time.strftime(tz_config["datetime_format"])
-                    else:
-                        tz = pytz.timezone(tz_config["timezone"])
-                        current_time = datetime.now(tz).strftime(tz_config["datetime_format"])
-                    
-                    self.labels[tz_name].config(text=current_time)
-                except (ValueError, pytz.UnknownTimeZoneError):
-                    try:
-                        current_time = time.strftime("%H:%M:%S\n%d-%m-%Y")
-                        self.labels[tz_name].config(text=current_time)
-                    except:
-                        current_time = "Error"
-                        self.labels[tz_name].config(text=current_time)
-            
-            self.root.after(1000, self.update_time)
+        self.tick_job = None
+        if not self.running or self.run_state == RUN_SUSPENDED or self.scrub_offset is not None:
+            return
+        if self.run_state == RUN_HIDDEN and not self.tick_buffer:
+            return
+        if self.tick_interval is not None:
+            self.check_clock_health(self.tick_interval)
+        started = time.perf_counter()
+        now = self.now()
+        # Each zone is formatted once per tick, however many windows show it
+        texts = [renderer.render(now) for renderer in self.renderers]
+        if self.run_state == RUN_VISIBLE:
+            for window in self.windows:
+                window.show(texts)
+            if self.shown_countdowns:
+                self.update_timer_status(now)
+            if self.stopwatch.running:
+                self.update_stopwatch_status()
+        if self.tick_buffer:
+            self.tick_buffer.publish(now, texts)
+        self.metrics.record("tick.render", time.perf_counter() - started)
+        
+        self.schedule_tick(now)
+    
+    def schedule_tick(self, now):
+        # Wake at the next instant any zone's text can change (next second for %S, next minute for %M...)
+        boundary = min(renderer.next_boundary(now) for renderer in self.renderers)
+        if self.shown_countdowns and self.run_state == RUN_VISIBLE:
+            boundary = min(boundary, int(now) + 1)
+        fps = self.frame_rate()
+        if fps:
+            boundary = min(boundary, frame_boundary(now, fps))
+        delay = max(1, int((boundary - self.now()) * 1000) + 1)
+        self.tick_interval = delay / 1000
+        self.tick_job = self.root.after(delay, self.update_time)
+        if delay > HEALTH_CHECK_MS and self.health_job is None:
+            self.health_job = self.root.after(HEALTH_CHECK_MS, self.watch_clock)
+    
+    def now(self):
+        # Rendered time, including the NTP correction when "apply" is on
+        return self.rendered_clock.time()
+    
+    def frame_rate(self):
+        # Sub-second refresh only while something sub-second is on screen; otherwise normal ticks
+        if self.run_state != RUN_VISIBLE or not (self.subsecond_shown or self.stopwatch.running):
+            return None
+        fps = self.config["subsecond_fps"]
+        return fps if fps in REFRESH_RATES else REFRESH_RATES[0]
+    
+    def check_clock_health(self, expected_interval):
+        event = self.clock_health.check(expected_interval)
+        if event:
+            self.metrics.record(f"clock.{event}", abs(self.clock_health.last_jump))
+            # Timer due times were aimed using the old wall clock
+            self.root.after_idle(self.fire_timers)
+            # Cached per-minute segments may belong to the wrong period after a jump
+            for renderer in self.renderers:
+                renderer.invalidate()
+        return event
+    
+    def watch_clock(self):
+        self.health_job = None
+        if self.tick_job is None:
+            return
+        if self.check_clock_health(HEALTH_CHECK_MS / 1000):
+            # The pending tick was timed against the old clock; render and re-aim now
+            self.cancel_tick()
+            self.update_time()
+        elif self.tick_interval > HEALTH_CHECK_MS / 1000:
+            self.health_job = self.root.after(HEALTH_CHECK_MS, self.watch_clock)
+    
+    def cancel_tick(self):
+        if self.tick_job is not None:
+            self.root.after_cancel(self.tick_job)
+            self.tick_job = None
+        if self.health_job is not None:
+            self.root.after_cancel(self.health_job)
+            self.health_job = None
+    
+    def restart_tick(self):
+        self.cancel_tick()
+        # Time spent stopped is not a clock fault; start health tracking afresh
+        self.clock_health.reset()
+        self.tick_interval = None
+        self.update_time()
+    
+    def setup_timers(self):
+        self.timers.load(self.config["timers"])
+        self.shown_countdowns = [
+            timer for timer in self.timers.timers.values()
+            if timer.kind == COUNTDOWN and timer.config["show"] and timer.due is not None
+        ]
+        self.schedule_timers()
+        self.update_timer_status(self.clock.time())
+    
+    def schedule_timers(self):
+        # One pending after() aimed at the earliest due timer; nothing scans the timer list per tick
+        shown = [
+            timer for timer in self.timers.timers.values()
+            if timer.kind != COUNTDOWN and timer.config["show"] and timer.due is not None
+        ]
+        self.next_timer = min(shown, key=lambda timer: timer.due) if shown else None
+        if self.timer_job is not None:
+            self.root.after_cancel(self.timer_job)
+            self.timer_job = None
+        due = self.timers.next_due()
+        if due is None:
+            return
+        delay = min(MAX_TIMER_WAIT_MS, max(1, int((due - self.clock.time()) * 1000) + 1))
+        self.timer_job = self.root.after(delay, self.fire_timers)
+    
+    def fire_timers(self):
+        self.timer_job = None
+        now = self.clock.time()
+        for timer in self.timers.pop_due(now):
+            if timer.config["notify"] and self.tray_icon:
+                titles = {ALARM: "Alarm", COUNTDOWN: "Countdown finished", REMINDER: "Reminder"}
+                self.tray_icon.notify(timer.name, titles.get(timer.kind, "Timer"))
+            if timer in self.shown_countdowns:
+                self.shown_countdowns.remove(timer)
+        self.schedule_timers()
+        self.update_timer_status(now)
+    
+    def update_timer_status(self, now):
+        lines = [timer.describe(now) for timer in self.shown_countdowns]
+        if self.next_timer:
+            lines.append("Next: " + self.next_timer.describe(now))
+        self.set_status("timers", "\n".join(lines))
+    
+    def update_stopwatch_status(self):
+        if not self.stopwatch.running and not self.stopwatch.elapsed():
+            self.set_status("stopwatch", "")
+            return
+        digits = 1 if self.config["subsecond_fps"] <= 10 else 2
+        lines = [f"Stopwatch {format_elapsed(self.stopwatch.elapsed(), digits)}"]
+        first = len(self.stopwatch.laps) - STOPWATCH_LAPS_SHOWN
+        for number, split in enumerate(self.stopwatch.laps[-STOPWATCH_LAPS_SHOWN:], max(first, 0) + 1):
+            lines.append(f"Lap {number} {format_elapsed(split, digits)}")
+        self.set_status("stopwatch", "\n".join(lines))
+    
+    def toggle_stopwatch(self, icon=None, item=None):
+        self.stopwatch.toggle()
+        # Switches between frame-rate and boundary ticks right away
+        self.restart_tick()
+        self.update_stopwatch_status()
+        if self.tray_icon:
+            self.tray_icon.menu = self.build_tray_menu()
+    
+    def lap_stopwatch(self, icon=None, item=None):
+        if self.stopwatch.running:
+            self.stopwatch.lap()
+            self.update_stopwatch_status()
+    
+    def reset_stopwatch(self, icon=None, item=None):
+        self.stopwatch.reset()
+        self.restart_tick()
+        self.update_stopwatch_status()
+        if self.tray_icon:
+            self.tray_icon.menu = self.build_tray_menu()
+    
+    def set_status(self, key, text):
+        if self.status_lines.get(key, "") == text:
+            return
+        self.status_lines[key] = text
+        combined = "\n".join(line for line in self.status_lines.values() if line)
+        if self.windows[0].set_status(combined) and self.positioned:
+            self.update_position()
+    
+    def set_run_state(self, state):
+        if state == self.run_state:
+            return
+        self.run_state = state
+        # Showing resyncs to the current second right away instead of waiting out an old timer
+        self.restart_tick()
     
     def update_position(self):
-        self.root.update_idletasks()
-        
-        if self.config["position"] == "custom":
-            x, y = self.config["custom_x"], self.config["custom_y"]
-        else:
-            screen_width = self.root.winfo_screenwidth()
-            screen_height = self.root.winfo_screenheight()
-            
-            self.clock_frame.update_idletasks()
-            self.root.update_idletasks()
-            
-            window_width = self.root.winfo_reqwidth()
-            window_height = self.root.winfo_reqheight()
-            
-            if window_width <= 1 or window_height <= 1:
-                estimated_width = len("00:00:00 AM") * max(tz["font_size"] for tz in self.config["timezones"]) * 0.6
-                estimated_height = sum(2 * tz["font_size"] * 1.5 for tz in self.config["timezones"])
-                window_width = int(estimated_width)
-                window_height = int(estimated_height)
-            
-            taskbar_margin = 40
-            side_margin = 10
-            
-            positions = {
-                "topleft": (side_margin, side_margin),
-                "topright": (screen_width - window_width - side_margin, side_margin),
-                "bottomleft": (side_margin, screen_height - window_height - taskbar_margin),
-                "bottomright": (screen_width - window_width - side_margin, screen_height - window_height - taskbar_margin),
-                "center": ((screen_width - window_width) // 2, (screen_height - window_height) // 2)
-            }
-            
-            x, y = positions.get(self.config["position"], (50, 50))
-        
-        self.root.geometry(f"+{x}+{y}")
-        self.position_x = x
-        self.position_y = y
-        self.root.update_idletasks()
+        started = time.perf_counter()
+        for window in self.windows:
+            window.update_position()
+        self.metrics.record("layout.update_position", time.perf_counter() - started)
+        self.position_x = self.windows[0].position_x
+        self.position_y = self.windows[0].position_y
+    
+    def set_windows_visible(self, visible):
+        for window in self.windows:
+            window.set_visible(visible)
+    
+    def setup_server(self):
+        if not self.config["server"]["enabled"]:
+            return
+        try:
+            self.server = ClockServer(self.config, clock=self.rendered_clock).start()
+        except OSError as e:
+            print(f"Error starting clock server: {e}")
+    
+    def setup_ntp(self):
+        settings = self.config["ntp"]
+        if not settings["enabled"]:
+            return
+        # Queries run on the monitor's thread; results come back through the command queue
+        self.ntp = NtpMonitor(settings, self.clock,
+                              lambda estimate, error: self.post_command(self.ntp_updated, estimate, error))
+        if settings["display"]:
+            self.set_status("ntp", format_estimate(None, None, settings["server"]))
+        self.ntp.start()
+    
+    def ntp_updated(self, estimate, error):
+        settings = self.config["ntp"]
+        if settings["display"]:
+            self.set_status("ntp", format_estimate(estimate, error, settings["server"]))
+        correction = estimate.offset if settings["apply"] and estimate else 0.0
+        if abs(correction - self.rendered_clock.offset) >= NTP_APPLY_THRESHOLD:
+            self.rendered_clock.offset = correction
+            self.restart_tick()
     
     def create_tray_image(self):
         image = Image.new('RGB', (64, 64), color='white')
@@ -197,28 +656,396 @@ class DesktopClock:
         
         return image
     
+    def setup_command_queue(self):
+        # Tray callbacks run on pystray's thread; they only enqueue and the Tk thread does the work.
+        # Threaded Tcl builds accept event_generate from other threads, otherwise fall back to polling.
+        self.command_wakeup = bool(int(self.root.tk.eval("info exists tcl_platform(threaded)")))
+        self.root.bind("<<TrayCommand>>", lambda e: self.process_commands())
+        if not self.command_wakeup:
+            self.root.after(COMMAND_POLL_MS, self.poll_commands)
+    
+    def post_command(self, command, *args):
+        self.commands.put((command, args, time.perf_counter()))
+        if self.command_wakeup:
+            try:
+                self.root.event_generate("<<TrayCommand>>", when="tail")
+            except (RuntimeError, tk.TclError):
+                pass
+    
+    def tray_command(self, command):
+        def action(icon, item):
+            self.post_command(command)
+        return action
+    
+    def process_commands(self):
+        while True:
+            try:
+                command, args, queued_at = self.commands.get_nowait()
+            except queue.Empty:
+                break
+            command(*args)
+            if not self.running:
+                return
+            self.root.update_idletasks()
+            self.metrics.record(f"tray.{command.__name__}", time.perf_counter() - queued_at)
+    
+    def poll_commands(self):
+        if self.running:
+            self.process_commands()
+            self.root.after(COMMAND_POLL_MS, self.poll_commands)
+    
+    def build_tray_menu(self):
+        return pystray.Menu(
+            MenuItem('Settings', self.tray_command(self.show_settings)),
+            MenuItem('Meeting Planner', self.tray_command(self.show_planner)),
+            MenuItem('Time Travel', self.tray_command(self.show_scrubber)),
+            MenuItem('Show Clock' if not self.config["visible"] else 'Hide Clock', self.tray_command(self.toggle_visibility)),
+            MenuItem('Profiles', pystray.Menu(*self.profile_menu_items())),
+            MenuItem('Stopwatch', pystray.Menu(
+                MenuItem('Stop' if self.stopwatch.running else 'Start', self.tray_command(self.toggle_stopwatch)),
+                MenuItem('Lap', self.tray_command(self.lap_stopwatch)),
+                MenuItem('Reset', self.tray_command(self.reset_stopwatch))
+            )),
+            pystray.Menu.SEPARATOR,
+            MenuItem('Exit', self.tray_command(self.quit_app))
+        )
+    
+    def profile_menu_items(self):
+        items = [
+            MenuItem(name, self.profile_command(name), checked=self.profile_checked(name), radio=True)
+            for name in self.config["profiles"]
+        ]
+        if items:
+            items.append(pystray.Menu.SEPARATOR)
+        items.append(MenuItem('Save Zones as Profile...', self.tray_command(self.save_profile_dialog)))
+        return items
+    
+    def profile_command(self, name):
+        def action(icon, item):
+            self.post_command(self.switch_profile, name)
+        return action
+    
+    def profile_checked(self, name):
+        def checked(item):
+            return self.config["profile"] == name
+        return checked
+    
     def setup_tray(self):
         image = self.create_tray_image()
         
-        menu = pystray.Menu(
-            MenuItem('Settings', self.show_settings),
-            MenuItem('Show Clock' if not self.config["visible"] else 'Hide Clock', self.toggle_visibility),
-            pystray.Menu.SEPARATOR,
-            MenuItem('Exit', self.quit_app)
-        )
+        menu = self.build_tray_menu()
         
-        self.tray_icon = pystray.Icon("desktop_clock", image, "Desktop Clock", menu)
+        self.tray_icon = pystray.Icon("desktop_clock", image, TRAY_TITLE, menu)
         
         tray_thread = threading.Thread(target=self.tray_icon.run, daemon=True)
         tray_thread.start()
     
+    def setup_dst(self):
+        settings = self.config["dst_alerts"]
+        self.dst = None
+        if settings["enabled"]:
+            self.dst = TransitionLookahead(self.config["timezones"], settings["horizon_days"])
+        self.schedule_dst()
+    
+    def schedule_dst(self):
+        # One after() aimed at the next notice or index re-arm; ticks never look at transitions
+        if self.dst_job is not None:
+            self.root.after_cancel(self.dst_job)
+            self.dst_job = None
+        if self.dst is None:
+            self.set_tray_title(TRAY_TITLE)
+            return
+        now = self.clock.time()
+        upcoming = self.dst.upcoming(now)
+        self.set_tray_title("\n".join([TRAY_TITLE] + [describe(transition, short=True)
+                                                      for transition in upcoming[:DST_TOOLTIP_LINES]]))
+        wake = self.dst.rearm_at
+        notice = self.dst.next_notice(now, self.config["dst_alerts"]["notify_days"], self.dst_notified)
+        if notice:
+            wake = min(wake, notice[0])
+        delay = min(MAX_TIMER_WAIT_MS, max(1, int((wake - now) * 1000) + 1))
+        self.dst_job = self.root.after(delay, self.check_dst)
+    
+    def check_dst(self):
+        self.dst_job = None
+        now = self.clock.time()
+        while True:
+            notice = self.dst.next_notice(now, self.config["dst_alerts"]["notify_days"], self.dst_notified)
+            if notice is None or notice[0] > now:
+                break
+            self.dst_notified.add(notice[1])
+            if self.tray_icon:
+                self.tray_icon.notify(describe(notice[1]), "Clock change")
+        self.schedule_dst()
+    
+    def set_tray_title(self, text):
+        if self.tray_icon and self.tray_icon.title != text[:TOOLTIP_LIMIT]:
+            self.tray_icon.title = text[:TOOLTIP_LIMIT]
+    
+    def setup_profiles(self):
+        # Every stored profile except the live one is compiled ahead so a switch builds nothing
+        if self.profile_job is not None:
+            self.root.after_cancel(self.profile_job)
+            self.profile_job = None
+        for renderers, label_sets in self.compiled_profiles.values():
+            self.destroy_label_sets(label_sets)
+        self.compiled_profiles = {}
+        self.pending_profiles = [name for name in self.config["profiles"] if name != self.config["profile"]]
+        if self.pending_profiles:
+            self.profile_job = self.root.after_idle(self.compile_pending_profile)
+    
+    def compile_pending_profile(self):
+        # One profile per idle slot, so compiling never holds up a tick
+        self.profile_job = None
+        name = self.pending_profiles.pop(0)
+        if name in self.config["profiles"] and name not in self.compiled_profiles:
+            self.compiled_profiles[name] = self.compile_profile(name)
+        if self.pending_profiles:
+            self.profile_job = self.root.after_idle(self.compile_pending_profile)
+    
+    def compile_profile(self, name):
+        zones = self.config["profiles"][name]
+        renderers = [ZoneRenderer(tz_config) for tz_config in zones]
+        label_sets = [window.build_labels(zones, renderers) for window in self.windows]
+        return renderers, label_sets
+    
+    def destroy_label_sets(self, label_sets):
+        for labels, zone_indexes, reserved in label_sets:
+            for index, label in zone_indexes:
+                label.destroy()
+    
+    def switch_profile(self, name):
+        if name == self.config["profile"] or name not in self.config["profiles"]:
+            return
+        started = time.perf_counter()
+        previous = self.config["profile"]
+        if previous not in self.config["profiles"]:
+            # Zones no profile holds would be lost with the switch; keep them under a name of their own
+            previous = self.unused_profile_name(previous or UNSAVED_PROFILE)
+            self.config["profiles"][previous] = self.config["timezones"]
+        # Only a switch straight after a change can find the profile not compiled yet
+        renderers, label_sets = self.compiled_profiles.pop(name, None) or self.compile_profile(name)
+        outgoing = (self.renderers, [(window.labels, window.zone_indexes, window.reserved) for window in self.windows])
+        self.config["profile"] = name
+        self.config["timezones"] = self.config["profiles"][name]
+        self.renderers = renderers
+        for window, label_set in zip(self.windows, label_sets):
+            window.use_labels(label_set)
+        # The outgoing set stays compiled, so switching back is just as quick
+        self.compiled_profiles[previous] = outgoing
+        self.zones_changed()
+        self.restart_tick()
+        self.update_position()
+        self.metrics.record("profile.switch", time.perf_counter() - started)
+        # Everything else that follows the zone list catches up after the frame is shown
+        self.root.after_idle(self.profile_switched)
+    
+    def unused_profile_name(self, base):
+        name = base
+        number = 2
+        while name in self.config["profiles"]:
+            name = f"{base} {number}"
+            number += 1
+        return name
+    
+    def profile_switched(self):
+        if self.server:
+            self.server.set_renderer(ClockRenderer(self.config, self.rendered_clock))
+        self.setup_dst()
+        if self.settings_window:
+            self.draft = ConfigDraft(self.config)
+            self.update_timezone_list()
+        if self.tray_icon:
+            self.tray_icon.menu = self.build_tray_menu()
+        self.save_config()
+    
+    def save_profile_dialog(self, icon=None, item=None):
+        name = simpledialog.askstring("Save Profile", "Save the current zones as profile:", parent=self.root,
+                                      initialvalue=self.config["profile"])
+        if name and name.strip():
+            self.save_profile(name.strip())
+    
+    def save_profile(self, name):
+        profiles = self.config["profiles"]
+        current = self.config["profile"]
+        if current in profiles and current != name:
+            # The profile being left keeps its zones; the live list now belongs to the new name
+            profiles[current] = copy.deepcopy(self.config["timezones"])
+        profiles[name] = self.config["timezones"]
+        self.config["profile"] = name
+        self.setup_profiles()
+        if self.tray_icon:
+            self.tray_icon.menu = self.build_tray_menu()
+        self.save_config()
+    
+    def show_planner(self, icon=None, item=None):
+        if self.planner_window is not None:
+            self.planner_window.deiconify()
+            self.planner_window.lift()
+            self.draw_planner()
+            return
+        self.planner_window = tk.Toplevel(self.root)
+        self.planner_window.title("Meeting Planner")
+        self.planner_window.protocol("WM_DELETE_WINDOW", self.close_planner)
+        
+        controls = ttk.Frame(self.planner_window, padding=10)
+        controls.pack(fill='x')
+        ttk.Label(controls, text="Days:").pack(side="left")
+        self.planner_days_var = tk.StringVar(value="14")
+        ttk.Spinbox(controls, textvariable=self.planner_days_var, from_=1, to=90, width=4,
+                    command=self.draw_planner).pack(side="left", padx=5)
+        ttk.Label(controls, text="At least zones:").pack(side="left", padx=(15, 0))
+        self.planner_zones_var = tk.StringVar(value=str(len(self.config["timezones"])))
+        ttk.Spinbox(controls, textvariable=self.planner_zones_var, from_=1, to=len(self.config["timezones"]),
+                    width=4, command=self.draw_planner).pack(side="left", padx=5)
+        ttk.Button(controls, text="Refresh", command=self.draw_planner).pack(side="left", padx=15)
+        
+        cell_width, cell_height = PLANNER_CELL_SIZE
+        self.planner_canvas = tk.Canvas(self.planner_window, bg="white", highlightthickness=0,
+                                        width=80 + cell_width * DAY_MINUTES // PLANNER_CELL_MINUTES)
+        self.planner_canvas.pack(fill='both', expand=True, padx=10)
+        self.planner_slots = tk.Listbox(self.planner_window, height=8)
+        self.planner_slots.pack(fill='x', padx=10, pady=10)
+        self.draw_planner()
+    
+    def draw_planner(self):
+        try:
+            days = max(1, min(90, int(self.planner_days_var.get())))
+            min_zones = int(self.planner_zones_var.get())
+        except ValueError:
+            return
+        # Rows are local days starting at today's local midnight
+        today = time.localtime(self.now())
+        start = time.mktime((today.tm_year, today.tm_mon, today.tm_mday, 0, 0, 0, 0, 0, -1))
+        try:
+            planner = MeetingPlanner(self.config["timezones"], start, days)
+        except (ValueError, KeyError, pytz.UnknownTimeZoneError) as e:
+            messagebox.showerror("Meeting Planner", f"Cannot plan with these zones: {e}")
+            return
+        zones = len(planner.zones)
+        canvas = self.planner_canvas
+        canvas.delete("all")
+        cell_width, cell_height = PLANNER_CELL_SIZE
+        cells_per_hour = 60 // PLANNER_CELL_MINUTES
+        for hour in range(0, 24, 2):
+            canvas.create_text(80 + hour * cells_per_hour * cell_width, 8, text=str(hour), anchor="w",
+                               font=("Segoe UI", 8))
+        for row, counts in enumerate(planner.heat(PLANNER_CELL_MINUTES)):
+            y = 18 + row * cell_height
+            canvas.create_text(4, y + cell_height // 2, anchor="w", font=("Segoe UI", 8),
+                               text=time.strftime("%a %d %b", time.localtime(start + row * 86400 + 43200)))
+            for cell, count in enumerate(counts):
+                if not count:
+                    continue
+                # Light to dark green as more zones are at work; full overlap is the darkest
+                shade = 230 - int(170 * count / zones)
+                if count >= min_zones:
+                    color = f"#{shade // 2:02x}{min(255, shade + 40):02x}{shade // 2:02x}"
+                else:
+                    color = f"#{shade:02x}{shade:02x}{shade:02x}"
+                x = 80 + cell * cell_width
+                canvas.create_rectangle(x, y, x + cell_width - 1, y + cell_height - 1, fill=color, outline="")
+        canvas.config(height=24 + days * cell_height)
+        self.planner_slots.delete(0, "end")
+        for slot_start, slot_end in planner.windows(min_zones, PLANNER_CELL_MINUTES):
+            self.planner_slots.insert("end", f"{time.strftime('%a %d %b %H:%M', time.localtime(slot_start))} - "
+                                             f"{time.strftime('%H:%M', time.localtime(slot_end))} "
+                                             f"({(slot_end - slot_start) // 60} min)")
+    
+    def close_planner(self):
+        if self.planner_window:
+            self.planner_window.destroy()
+            self.planner_window = None
+    
+    def show_scrubber(self, icon=None, item=None):
+        if self.scrub_window is not None:
+            self.scrub_window.deiconify()
+            self.scrub_window.lift()
+            return
+        self.scrub_window = tk.Toplevel(self.root)
+        self.scrub_window.title("Time Travel")
+        self.scrub_window.protocol("WM_DELETE_WINDOW", self.close_scrubber)
+        
+        frame = ttk.Frame(self.scrub_window, padding=10)
+        frame.pack(fill='both', expand=True)
+        self.scrub_var = tk.DoubleVar(value=0)
+        scale = ttk.Scale(frame, from_=-SCRUB_RANGE_MINUTES, to=SCRUB_RANGE_MINUTES, orient="horizontal",
+                          length=480, variable=self.scrub_var, command=self.scrub_moved)
+        scale.pack(fill='x')
+        scale.bind("<ButtonRelease-1>", self.end_scrub)
+        scale.bind("<KeyRelease>", self.hold_scrub)
+        scale.bind("<FocusOut>", self.end_scrub)
+        self.scrub_label = ttk.Label(frame, text=SCRUB_HINT)
+        self.scrub_label.pack(pady=(5, 0))
+    
+    def scrub_moved(self, value):
+        # Motion events can outpace the display; keep only the latest position and render it once per frame
+        if self.scrub_offset is None:
+            self.cancel_tick()
+        self.cancel_scrub_hold()
+        self.scrub_offset = int(float(value))
+        if self.scrub_job is None:
+            self.scrub_job = self.root.after(SCRUB_FRAME_MS, self.render_scrub)
+    
+    def render_scrub(self):
+        self.scrub_job = None
+        if self.scrub_offset is None:
+            return
+        started = time.perf_counter()
+        instant = self.now() + self.scrub_offset * 60
+        # The live renderers take any instant: periods come from their offset tables, not from "now"
+        texts = [renderer.render(instant) for renderer in self.renderers]
+        if self.run_state == RUN_VISIBLE:
+            for window in self.windows:
+                window.show(texts)
+        days, minutes = divmod(abs(self.scrub_offset), 1440)
+        sign = "-" if self.scrub_offset < 0 else "+"
+        shift = sign + (f"{days}d " if days else "") + f"{minutes // 60}h {minutes % 60:02d}m"
+        self.set_status("scrub", f"Preview {shift}")
+        self.scrub_label.config(text=time.strftime("%a %d %b %Y %H:%M", time.localtime(instant)) + f" ({shift})")
+        self.metrics.record("scrub.render", time.perf_counter() - started)
+    
+    def hold_scrub(self, event=None):
+        if self.scrub_offset is None:
+            return
+        self.cancel_scrub_hold()
+        self.scrub_hold_job = self.root.after(SCRUB_KEY_HOLD_MS, self.end_scrub)
+    
+    def cancel_scrub_hold(self):
+        if self.scrub_hold_job is not None:
+            self.root.after_cancel(self.scrub_hold_job)
+            self.scrub_hold_job = None
+    
+    def end_scrub(self, event=None):
+        self.cancel_scrub_hold()
+        if self.scrub_job is not None:
+            self.root.after_cancel(self.scrub_job)
+            self.scrub_job = None
+        if self.scrub_offset is None:
+            return
+        self.scrub_var.set(0)
+        self.scrub_offset = None
+        self.set_status("scrub", "")
+        if self.scrub_window is not None:
+            self.scrub_label.config(text=SCRUB_HINT)
+        self.restart_tick()
+    
+    def close_scrubber(self):
+        self.end_scrub()
+        if self.scrub_window:
+            self.scrub_window.destroy()
+            self.scrub_window = None
+    
     def show_settings(self, icon=None, item=None):
         if self.settings_window is not None:
             self.settings_window.deiconify()
             self.settings_window.lift()
             self.settings_window.focus_set()
+            self.stats_label.config(text=self.metrics.report())
             return
         
+        # Edits go to a draft sharing the live zones until Apply; Cancel just drops it
+        self.draft = ConfigDraft(self.config)
         self.settings_window = tk.Toplevel(self.root)
         self.settings_window.title("Clock Settings")
         self.settings_window.geometry(self.box_geometry)
@@ -269,6 +1096,31 @@ class DesktopClock:
 
         ttk.Label(self.custom_frame, text=f"Pos. (x,y): {self.position_x,self.position_y}").grid(row=0, column=4, sticky='w', padx=(20,0)) 
         self.on_position_change()
+        
+        self.stable_layout_var = tk.BooleanVar(value=self.config["layout"] == "stable")
+        ttk.Checkbutton(pos_frame, text="Reserve widest width (no resizing as digits change)",
+                        variable=self.stable_layout_var).pack(anchor="w", pady=(5, 0))
+        
+        refresh_frame = ttk.LabelFrame(general_frame, text="Refresh", padding=10)
+        refresh_frame.pack(fill='x', pady=5)
+        ttk.Label(refresh_frame, text="Sub-second fields (%f, %L) and stopwatch, frames per second:").pack(side="left")
+        self.subsecond_fps_var = tk.StringVar(value=str(self.config["subsecond_fps"]))
+        fps_combo = ttk.Combobox(refresh_frame, textvariable=self.subsecond_fps_var, width=5, state="readonly")
+        fps_combo['values'] = [str(rate) for rate in REFRESH_RATES]
+        fps_combo.pack(side="left", padx=5)
+        
+        dst_frame = ttk.LabelFrame(general_frame, text="Clock changes", padding=10)
+        dst_frame.pack(fill='x', pady=5)
+        dst_settings = self.config["dst_alerts"]
+        self.dst_enabled_var = tk.BooleanVar(value=dst_settings["enabled"])
+        ttk.Checkbutton(dst_frame, text="Warn about DST changes in the next",
+                        variable=self.dst_enabled_var).pack(side="left")
+        self.dst_horizon_var = tk.StringVar(value=str(dst_settings["horizon_days"]))
+        ttk.Spinbox(dst_frame, textvariable=self.dst_horizon_var, from_=1, to=365, width=4).pack(side="left", padx=5)
+        ttk.Label(dst_frame, text="days, notify").pack(side="left")
+        self.dst_notify_var = tk.StringVar(value=str(dst_settings["notify_days"]))
+        ttk.Spinbox(dst_frame, textvariable=self.dst_notify_var, from_=0, to=60, width=3).pack(side="left", padx=5)
+        ttk.Label(dst_frame, text="days ahead").pack(side="left")
         # Timezone Tab
         timezone_frame = ttk.Frame(notebook, padding=10)
         notebook.add(timezone_frame, text="Timezones")
@@ -293,10 +1145,14 @@ class DesktopClock:
         scrollbar_y.pack(side="right", fill="y") 
         scrollbar_x.pack(fill="x") 
         
-        add_button = ttk.Button(timezone_frame, text="Add Timezone", command=self.add_timezone_dialog)
-        add_button.pack(pady=5)
+        edit_frame = ttk.Frame(timezone_frame)
+        edit_frame.pack(pady=5)
+        ttk.Button(edit_frame, text="Add Timezone", command=self.add_timezone_dialog).pack(side='left', padx=5)
+        ttk.Button(edit_frame, text="Undo", command=self.undo_settings).pack(side='left', padx=5)
+        ttk.Button(edit_frame, text="Redo", command=self.redo_settings).pack(side='left', padx=5)
+        self.settings_window.bind("<Control-z>", self.undo_settings)
+        self.settings_window.bind("<Control-y>", self.redo_settings)
         
-        self.timezone_widgets = {}
         self.update_timezone_list()
         # Info Tab
         timeinfo_frame = ttk.Frame(notebook, padding=10)
@@ -318,6 +1174,10 @@ Setup for Auto Start:
         """  
         self.info_label = self.make_clickable_text(timeinfo_frame, info_text)
         self.info_label.pack(padx=10, pady=20, anchor="w")
+        stats_frame = ttk.LabelFrame(timeinfo_frame, text="Performance", padding=5)
+        stats_frame.pack(fill='x', padx=10)
+        self.stats_label = ttk.Label(stats_frame, text=self.metrics.report(), font=("Consolas", 8), justify="left")
+        self.stats_label.pack(anchor="w")
         # toggle_info
         button_frame = ttk.Frame(self.settings_window)
         button_frame.pack(fill='x', padx=10, pady=10)
@@ -333,75 +1193,178 @@ Setup for Auto Start:
         for widget in self.scrollable_frame.winfo_children():
             widget.destroy()
         
-        self.timezone_widgets = {}
-        
-        headers = ["Name", "Timezone", "Font", "Size", "Format", "Color", ""]
+        headers = ["Name", "Timezone", "Font", "Size", "Format", "Color", "Locale", "Scale", ""]
         for col, header in enumerate(headers):
             ttk.Label(self.scrollable_frame, text=header, font=("Arial", 9, "bold")).grid(
                 row=0, column=col, padx=2, pady=5, sticky="w"
             )
         
-        for i, tz_config in enumerate(self.config["timezones"]):
-            name_var = tk.StringVar(value=tz_config["name"])
-            name_entry = ttk.Entry(self.scrollable_frame, textvariable=name_var, width=15)
-            name_entry.grid(row=i+1, column=0, padx=2, pady=2, sticky="ew")
-            
-            tz_var = tk.StringVar(value=tz_config["timezone"])
-            tz_combo = ttk.Combobox(self.scrollable_frame, textvariable=tz_var, width=20)
-            tz_combo['values'] = ["local"] + sorted(pytz.all_timezones)
-            tz_combo.grid(row=i+1, column=1, padx=2, pady=2, sticky="ew")
-            
-            font_var = tk.StringVar(value=tz_config["font_family"])
-            font_combo = ttk.Combobox(self.scrollable_frame, textvariable=font_var, width=15)
-            font_combo['values'] = list(font.families())
-            font_combo.grid(row=i+1, column=2, padx=2, pady=2, sticky="ew")
-            
-            size_var = tk.StringVar(value=str(tz_config["font_size"]))
-            size_spin = ttk.Spinbox(self.scrollable_frame, textvariable=size_var, from_=8, to=72, width=5)
-            size_spin.grid(row=i+1, column=3, padx=2, pady=2, sticky="ew")
-            
-            format_var = tk.StringVar(value=tz_config["datetime_format"])
-            format_entry = ttk.Entry(self.scrollable_frame, textvariable=format_var, width=20, state="readonly")
-            # Bind click to open dialog
-            format_entry.bind("<Button-1>", lambda e, w=format_entry: self.edit_text_dialog(w))
-            format_entry.grid(row=i+1, column=4, padx=2, pady=2, sticky="ew")
-            
-            color_var = tk.StringVar(value=tz_config.get("color", "white"))
-            color_combo = ttk.Combobox(self.scrollable_frame, textvariable=color_var, width=10)
-            color_combo['values'] = ["white", "red", "green", "blue", "yellow", "cyan", "magenta"]
-            color_combo.grid(row=i+1, column=5, padx=2, pady=2, sticky="ew")
-            
-            delete_btn = ttk.Button(self.scrollable_frame, text="X", width=2,
-                                  command=lambda idx=i: self.remove_timezone(idx))
-            delete_btn.grid(row=i+1, column=6, padx=2, pady=2, sticky="ew")
-            
-            self.timezone_widgets[i] = {
+        self.timezone_rows = [self.add_timezone_row(i, tz_config) for i, tz_config in enumerate(self.draft.zones)]
+    
+    def add_timezone_row(self, i, tz_config):
+        # One row of widgets; its vars are keyed like the zone config so they sync straight into the draft
+        name_var = tk.StringVar(value=tz_config["name"])
+        name_entry = ttk.Entry(self.scrollable_frame, textvariable=name_var, width=15)
+        name_entry.grid(row=i+1, column=0, padx=2, pady=2, sticky="ew")
+        
+        tz_var = tk.StringVar(value=tz_config["timezone"])
+        tz_combo = ttk.Combobox(self.scrollable_frame, textvariable=tz_var, width=20)
+        tz_combo['values'] = ["local"] + sorted(pytz.all_timezones)
+        tz_combo.grid(row=i+1, column=1, padx=2, pady=2, sticky="ew")
+        
+        font_var = tk.StringVar(value=tz_config["font_family"])
+        font_combo = ttk.Combobox(self.scrollable_frame, textvariable=font_var, width=15)
+        font_combo['values'] = list(font.families())
+        font_combo.grid(row=i+1, column=2, padx=2, pady=2, sticky="ew")
+        
+        size_var = tk.StringVar(value=str(tz_config["font_size"]))
+        size_spin = ttk.Spinbox(self.scrollable_frame, textvariable=size_var, from_=8, to=72, width=5)
+        size_spin.grid(row=i+1, column=3, padx=2, pady=2, sticky="ew")
+        
+        format_var = tk.StringVar(value=tz_config["datetime_format"])
+        format_entry = ttk.Entry(self.scrollable_frame, textvariable=format_var, width=20, state="readonly")
+        # Bind click to open dialog
+        format_entry.bind("<Button-1>", lambda e, w=format_entry: self.edit_text_dialog(w))
+        format_entry.grid(row=i+1, column=4, padx=2, pady=2, sticky="ew")
+        
+        color_var = tk.StringVar(value=tz_config.get("color", "white"))
+        color_combo = ttk.Combobox(self.scrollable_frame, textvariable=color_var, width=10)
+        color_combo['values'] = ["white", "red", "green", "blue", "yellow", "cyan", "magenta"]
+        color_combo.grid(row=i+1, column=5, padx=2, pady=2, sticky="ew")
+        
+        locale_var = tk.StringVar(value=tz_config.get("locale", ""))
+        locale_entry = ttk.Entry(self.scrollable_frame, textvariable=locale_var, width=8)
+        locale_entry.grid(row=i+1, column=6, padx=2, pady=2, sticky="ew")
+        
+        scale_var = tk.StringVar(value=tz_config.get("scale", "utc"))
+        scale_combo = ttk.Combobox(self.scrollable_frame, textvariable=scale_var, width=5, state="readonly")
+        scale_combo['values'] = time_scale_names()
+        scale_combo.grid(row=i+1, column=7, padx=2, pady=2, sticky="ew")
+        
+        row = {
+            "vars": {
                 "name": name_var,
                 "timezone": tz_var,
                 "font_family": font_var,
                 "font_size": size_var,
-                "format": format_var,
-                "color": color_var
+                "datetime_format": format_var,
+                "color": color_var,
+                "locale": locale_var,
+                "scale": scale_var
             }
+        }
+        delete_btn = ttk.Button(self.scrollable_frame, text="X", width=2,
+                              command=lambda: self.remove_timezone(row))
+        delete_btn.grid(row=i+1, column=8, padx=2, pady=2, sticky="ew")
+        row["widgets"] = [name_entry, tz_combo, font_combo, size_spin, format_entry,
+                          color_combo, locale_entry, scale_combo, delete_btn]
+        return row
+    
+    def sync_draft(self):
+        # Typed values reach the draft here; rows that still match keep sharing the live zone dicts
+        for index, row in enumerate(self.timezone_rows):
+            values = {key: var.get() for key, var in row["vars"].items()}
+            values["font_size"] = int(values["font_size"])
+            values["locale"] = values["locale"].strip()
+            self.draft.update_zone(index, values)
+    
+    def sync_draft_quietly(self):
+        try:
+            self.sync_draft()
+        except ValueError:
+            # Left as typed; Apply reports it
+            pass
+    
+    def undo_settings(self, event=None):
+        self.sync_draft_quietly()
+        if self.draft.undo():
+            self.update_timezone_list()
+    
+    def redo_settings(self, event=None):
+        self.sync_draft_quietly()
+        if self.draft.redo():
+            self.update_timezone_list()
     
     def add_timezone_dialog(self):
+        if self.city_index is None:
+            try:
+                self.city_index = open_index()
+            except OSError as e:
+                messagebox.showwarning("Add Timezone", f"City search is unavailable: {e}")
+                self.add_timezone()
+                return
+        dialog = tk.Toplevel(self.settings_window or self.root)
+        dialog.title("Add Timezone")
+        dialog.grab_set()
+        query_var = tk.StringVar()
+        query_entry = ttk.Entry(dialog, textvariable=query_var, width=50)
+        query_entry.pack(padx=10, pady=(10, 5), fill='x')
+        query_entry.focus_set()
+        results = tk.Listbox(dialog, height=10)
+        results.pack(padx=10, fill='both', expand=True)
+        matches = []
+        
+        def update_results(*args):
+            matches[:] = self.city_index.search(query_var.get())
+            results.delete(0, "end")
+            for city in matches:
+                results.insert("end", f"{city.name} ({city.timezone})")
+            if matches:
+                results.selection_set(0)
+        
+        def add_and_close(event=None):
+            selection = results.curselection()
+            self.add_timezone(matches[selection[0]] if selection else None)
+            dialog.destroy()
+        
+        def add_local():
+            self.add_timezone()
+            dialog.destroy()
+        
+        query_var.trace_add("write", update_results)
+        query_entry.bind("<Return>", add_and_close)
+        results.bind("<Double-Button-1>", add_and_close)
+        btn_frame = ttk.Frame(dialog)
+        btn_frame.pack(pady=5)
+        ttk.Button(btn_frame, text="Add", command=add_and_close).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Add Local Time", command=add_local).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Cancel", command=dialog.destroy).pack(side="left", padx=5)
+    
+    def add_timezone(self, city=None):
         new_tz = {
-            "name": f"Time {len(self.config['timezones']) + 1}",
+            "name": f"Time {len(self.draft.zones) + 1}",
             "timezone": "local",
             "font_family": "Segoe UI",
             "font_size": 12,
             "datetime_format": "%H:%M:%S\n%d-%m-%Y",
-            "color": "white"
+            "color": "white",
+            "locale": "",
+            "scale": "utc"
         }
-        self.config["timezones"].append(new_tz)
-        self.update_timezone_list()
+        if city is not None:
+            new_tz["name"] = city.name.split(",")[0]
+            new_tz["timezone"] = city.timezone
+            # Coordinates come with the city, so sunrise/sunset fields work right away
+            new_tz["latitude"] = city.latitude
+            new_tz["longitude"] = city.longitude
+        self.sync_draft_quietly()
+        self.draft.add_zone(new_tz)
+        self.timezone_rows.append(self.add_timezone_row(len(self.timezone_rows), new_tz))
     
-    def remove_timezone(self, index):
-        if len(self.config["timezones"]) > 1:
-            self.config["timezones"].pop(index)
-            self.update_timezone_list()
-        else:
+    def remove_timezone(self, row):
+        if len(self.draft.zones) <= 1:
             messagebox.showwarning("Warning", "You must have at least one timezone.")
+            return
+        self.sync_draft_quietly()
+        index = self.timezone_rows.index(row)
+        self.draft.remove_zone(index)
+        for widget in row["widgets"]:
+            widget.destroy()
+        del self.timezone_rows[index]
+        # Only the rows below move up
+        for position in range(index, len(self.timezone_rows)):
+            for widget in self.timezone_rows[position]["widgets"]:
+                widget.grid_configure(row=position + 1)
     
     def make_clickable_text(self, parent, text):
         text_widget = tk.Text(parent, wrap="word", width=65, height=15,
@@ -446,29 +1409,63 @@ Setup for Auto Start:
     
     def apply_settings(self):
         try:
-            self.config["position"] = self.position_var.get()
-            self.config["custom_x"] = int(self.custom_x_var.get())
-            self.config["custom_y"] = int(self.custom_y_var.get())
-            self.config["position_x"] = int(self.position_x)
-            self.config["position_y"] = int(self.position_y)
-            
-            for i, tz_config in enumerate(self.config["timezones"]):
-                if i in self.timezone_widgets:
-                    widgets = self.timezone_widgets[i]
-                    tz_config["name"] = widgets["name"].get()
-                    tz_config["timezone"] = widgets["timezone"].get()
-                    tz_config["font_family"] = widgets["font_family"].get()
-                    tz_config["font_size"] = int(widgets["font_size"].get())
-                    tz_config["datetime_format"] = widgets["format"].get()
-                    tz_config["color"] = widgets["color"].get()
-            
-            self.create_timezone_labels() 
-            self.save_config() 
-            messagebox.showinfo("Settings", "Settings applied successfully!")
-            self.update_position()
-            
+            self.draft.update({
+                "position": self.position_var.get(),
+                "custom_x": int(self.custom_x_var.get()),
+                "custom_y": int(self.custom_y_var.get()),
+                "position_x": int(self.position_x),
+                "position_y": int(self.position_y),
+                "layout": "stable" if self.stable_layout_var.get() else "auto",
+                "subsecond_fps": int(self.subsecond_fps_var.get()),
+                "dst_alerts": dict(self.draft.get("dst_alerts"),
+                                   enabled=self.dst_enabled_var.get(),
+                                   horizon_days=int(self.dst_horizon_var.get()),
+                                   notify_days=int(self.dst_notify_var.get()))
+            })
+            self.sync_draft()
         except ValueError as e:
             messagebox.showerror("Error", f"Invalid input: {e}")
+            return
+        
+        diff = self.draft.diff()
+        if diff is not None:
+            self.apply_diff(diff)
+            self.save_config()
+        self.draft = ConfigDraft(self.config)
+        messagebox.showinfo("Settings", "Settings applied successfully!")
+    
+    def apply_diff(self, diff):
+        # Only what changed is rebuilt: zones that are the same objects keep their renderers and labels
+        self.config.update(diff.settings)
+        if diff.zones is not None:
+            zones = self.config["timezones"]
+            in_place = len(diff.zones) == len(zones) and all(
+                zone is zones[index] or "name" not in diff.changed.get(index, {"name"})
+                for index, zone in enumerate(diff.zones)
+            )
+            renderers = {id(zone): renderer for zone, renderer in zip(zones, self.renderers)}
+            # Mutated in place: the active profile shares this list
+            zones[:] = diff.zones
+            self.renderers = [renderers.get(id(zone)) or ZoneRenderer(zone) for zone in zones]
+            for window in self.windows:
+                if in_place:
+                    window.restyle(diff.changed)
+                else:
+                    window.create_timezone_labels(zones)
+            self.zones_changed()
+            if self.server:
+                self.server.set_renderer(ClockRenderer(self.config, self.rendered_clock))
+        elif "layout" in diff.settings:
+            for window in self.windows:
+                window.reserve_layout()
+        if "layout" in diff.settings:
+            # Compiled profiles carry sizes reserved under the old layout
+            self.setup_profiles()
+        if diff.zones is not None or "dst_alerts" in diff.settings:
+            self.setup_dst()
+        if diff.zones is not None or "subsecond_fps" in diff.settings:
+            self.restart_tick()
+        self.update_position()
     
     def apply_and_close(self):
         self.apply_settings()
@@ -482,25 +1479,18 @@ Setup for Auto Start:
         if self.settings_window:
             self.settings_window.destroy()
             self.settings_window = None
+            self.draft = None
     
     def toggle_visibility(self, icon=None, item=None):
         self.config["visible"] = not self.config["visible"]
         
-        if self.config["visible"]:
-            self.root.deiconify()
-        else:
-            self.root.withdraw()
+        self.set_run_state(RUN_VISIBLE if self.config["visible"] else RUN_HIDDEN)
+        self.set_windows_visible(self.config["visible"])
         self.update_position()
         self.save_config()
         
         if self.tray_icon:
-            menu = pystray.Menu(
-                MenuItem('Settings', self.show_settings),
-                MenuItem('Show Clock' if not self.config["visible"] else 'Hide Clock', self.toggle_visibility),
-                pystray.Menu.SEPARATOR,
-                MenuItem('Exit', self.quit_app)
-            )
-            self.tray_icon.menu = menu
+            self.tray_icon.menu = self.build_tray_menu()
     
     def edit_text_dialog(self, entry_widget):
         # Create a new dialog window
@@ -531,18 +1521,13 @@ Setup for Auto Start:
     
     def hide_window(self):
         self.config["visible"] = False
-        self.root.withdraw()
+        self.set_run_state(RUN_HIDDEN)
+        self.set_windows_visible(False)
         
         self.save_config()
         
         if self.tray_icon:
-            menu = pystray.Menu(
-                MenuItem('Settings', self.show_settings),
-                MenuItem('Show Clock', self.toggle_visibility),
-                pystray.Menu.SEPARATOR,
-                MenuItem('Exit', self.quit_app)
-            )
-            self.tray_icon.menu = menu
+            self.tray_icon.menu = self.build_tray_menu()
     
 
     def check_single_instance(self):
@@ -557,6 +1542,7 @@ Setup for Auto Start:
             os.remove(self.lock_file)
 
     def quit_app(self, icon=None, item=None):
+        self.set_run_state(RUN_SUSPENDED)
         self.running = False
         self.save_config()
         
@@ -566,6 +1552,12 @@ Setup for Auto Start:
         
         if self.tray_icon:
             self.tray_icon.stop()
+        if self.server:
+            self.server.stop()
+        if self.ntp:
+            self.ntp.stop()
+        if self.tick_buffer:
+            self.tick_buffer.close()
         self.cleanup()
         self.root.quit()
         self.root.destroy()
@@ -574,7 +1566,8 @@ Setup for Auto Start:
     def run(self):
         self.check_single_instance()
         if not self.config["visible"]:
-            self.root.withdraw()
+            self.set_run_state(RUN_HIDDEN)
+            self.set_windows_visible(False)
         
         try:
             self.root.mainloop()
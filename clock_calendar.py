@@ -0,0 +1,240 @@
+import argparse
+import calendar
+import csv
+import math
+import sys
+import time
+from datetime import date, timedelta
+
+from clock_engine import DEFAULT_ZONE, load_config_file, register_extension
+from clock_planner import DAY_MINUTES, ZoneHours
+
+OPEN = "open"
+CLOSED = "closed"
+WEEKEND = "weekend"
+HOLIDAY = "holiday"
+# How far ahead "opens in" looks before giving up (a zone with no business days at all)
+SEARCH_YEARS = 2
+
+
+def parse_date(text):
+    text = text.strip()
+    if len(text) >= 8 and text[:8].isdigit():
+        return date(int(text[:4]), int(text[4:6]), int(text[6:8]))
+    return date.fromisoformat(text[:10])
+
+
+def unfold_ics(lines):
+    # RFC 5545: a line starting with a space or tab continues the previous one
+    unfolded = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and unfolded:
+            unfolded[-1] += line[1:]
+        elif line:
+            unfolded.append(line)
+    return unfolded
+
+
+def load_ics(path, years):
+    """{date: name} for all-day events, expanding FREQ=YEARLY over `years`"""
+    holidays = {}
+    with open(path, encoding="utf-8") as f:
+        lines = unfold_ics(f)
+    event = None
+    for line in lines:
+        if line == "BEGIN:VEVENT":
+            event = {}
+        elif line == "END:VEVENT" and event is not None:
+            if "DTSTART" in event:
+                start = parse_date(event["DTSTART"])
+                end = parse_date(event["DTEND"]) if "DTEND" in event else start + timedelta(days=1)
+                name = event.get("SUMMARY", "Holiday").replace("\\,", ",").replace("\\;", ";")
+                if "FREQ=YEARLY" in event.get("RRULE", ""):
+                    starts = [start.replace(year=year) for year in years if year >= start.year
+                              and not (start.month == 2 and start.day == 29 and not calendar.isleap(year))]
+                else:
+                    starts = [start]
+                for first in starts:
+                    for offset in range(max(1, (end - start).days)):
+                        holidays[first + timedelta(days=offset)] = name
+            event = None
+        elif event is not None and ":" in line:
+            key, value = line.split(":", 1)
+            event[key.split(";", 1)[0].upper()] = value
+    return holidays
+
+
+def load_csv(path):
+    """{date: name} from rows of date,name (ISO or YYYYMMDD dates; other rows are skipped)"""
+    holidays = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if not row:
+                continue
+            try:
+                day = parse_date(row[0])
+            except ValueError:
+                continue
+            holidays[day] = row[1].strip() if len(row) > 1 and row[1].strip() else "Holiday"
+    return holidays
+
+
+def load_holidays(paths, years):
+    holidays = {}
+    for path in paths:
+        try:
+            if path.lower().endswith(".ics"):
+                holidays.update(load_ics(path, years))
+            else:
+                holidays.update(load_csv(path))
+        except (OSError, ValueError) as e:
+            print(f"Error reading holidays from {path}: {e}")
+    return holidays
+
+
+def format_duration(seconds):
+    minutes = math.ceil(seconds / 60)
+    days, minutes = divmod(minutes, DAY_MINUTES)
+    hours, minutes = divmod(minutes, 60)
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    return f"{minutes}m"
+
+
+class BusinessCalendar:
+    """Open/closed/weekend/holiday state of one zone, from per-year day bitsets.
+
+    Bit d of a year's mask is day-of-year d (0 = Jan 1). The state is cached until the next
+    open/close instant, so a tick is a comparison; "next open" is a lowest-set-bit scan.
+    """
+
+    resolution = 60
+
+    def __init__(self, tz_config):
+        tz_config = dict(DEFAULT_ZONE, **tz_config)
+        self.hours = ZoneHours(tz_config)
+        this_year = time.gmtime().tm_year
+        self.holidays = load_holidays(tz_config["holidays"], range(this_year - 1, this_year + SEARCH_YEARS + 1))
+        self.years = {}
+        self.invalidate()
+
+    def invalidate(self):
+        self.valid_from = math.inf
+        self.valid_until = -math.inf
+
+    def year_masks(self, year):
+        """(business days, holidays) bitsets for one year, built on first use"""
+        masks = self.years.get(year)
+        if masks is None:
+            first = date(year, 1, 1)
+            workdays = holidays = 0
+            for index in range(366 if calendar.isleap(year) else 365):
+                day = first + timedelta(days=index)
+                if day.weekday() in self.hours.days:
+                    workdays |= 1 << index
+                if day in self.holidays:
+                    holidays |= 1 << index
+            masks = self.years[year] = (workdays & ~holidays, holidays)
+        return masks
+
+    def is_business_day(self, day):
+        business, _ = self.year_masks(day.year)
+        return bool(business >> (day.timetuple().tm_yday - 1) & 1)
+
+    def next_business_day(self, day):
+        """First business day on or after `day`, or None within SEARCH_YEARS"""
+        index = day.timetuple().tm_yday - 1
+        for year in range(day.year, day.year + SEARCH_YEARS + 1):
+            later = self.year_masks(year)[0] >> index
+            if later:
+                return date(year, 1, 1) + timedelta(days=index + (later & -later).bit_length() - 1)
+            index = 0
+        return None
+
+    def wall(self, now):
+        if self.hours.table is None:
+            return now + time.localtime(now).tm_gmtoff
+        return now + self.hours.table.utcoffset(now)
+
+    def day_start(self, day):
+        return calendar.timegm(day.timetuple())
+
+    def compute(self, now):
+        """Return (state, label, until); until is the next open/close instant (UTC)"""
+        wall = self.wall(now)
+        today = date(*time.gmtime(wall)[:3])
+        minute = (wall - self.day_start(today)) / 60
+        hours = self.hours
+        # An overnight shift that started yesterday may still be running
+        for day, offset in ((today - timedelta(days=1), DAY_MINUTES), (today, 0)):
+            if self.is_business_day(day) and hours.start <= minute + offset < hours.end:
+                return OPEN, "Open", hours.to_utc(self.day_start(day) + hours.end * 60)
+        candidate = today if minute < hours.start else today + timedelta(days=1)
+        opening = self.next_business_day(candidate)
+        until = hours.to_utc(self.day_start(opening) + hours.start * 60) if opening else math.inf
+        if today in self.holidays:
+            return HOLIDAY, self.holidays[today], until
+        if today.weekday() not in hours.days:
+            return WEEKEND, "Weekend", until
+        return CLOSED, "Closed", until
+
+    def status(self, now):
+        """(state, label, until), recomputed only once the cached answer can have changed"""
+        if not self.valid_from <= now < self.valid_until:
+            self.current = self.compute(now)
+            # The label also depends on the local date: a holiday ends at midnight
+            tomorrow = date(*time.gmtime(self.wall(now))[:3]) + timedelta(days=1)
+            self.valid_from = now
+            self.valid_until = min(self.current[2], self.hours.to_utc(self.day_start(tomorrow)))
+        return self.current
+
+    def render(self, now):
+        state, label, until = self.status(now)
+        if until == math.inf:
+            return label
+        verb = "closes" if state == OPEN else "opens"
+        return f"{label} · {verb} in {format_duration(until - now)}"
+
+    def samples(self, now):
+        durations = ("00d 00h", "00h 00m", "00m")
+        closed = ["Closed", "Weekend", *set(self.holidays.values())]
+        texts = ["Open", *closed]
+        texts += [f"Open · closes in {duration}" for duration in durations]
+        texts += [f"{label} · opens in {duration}" for label in closed for duration in durations]
+        return texts
+
+
+register_extension("business", BusinessCalendar)
+
+
+def benchmark(zone, ticks=100000):
+    business = BusinessCalendar(zone)
+    now = time.time()
+    started = time.perf_counter()
+    for tick in range(ticks):
+        business.render(now + tick)
+    elapsed = time.perf_counter() - started
+    print(f"{ticks} one-second ticks in {elapsed:.2f}s: {elapsed / ticks * 1e6:.2f} us per %{{business}} render")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show business-hours state and holidays for the configured zones")
+    parser.add_argument("--config", default="clock_config.json", help="path to clock_config.json")
+    parser.add_argument("--bench", action="store_true", help="time per-tick rendering for the first zone")
+    args = parser.parse_args(argv)
+    config = load_config_file(args.config)
+    if args.bench:
+        benchmark(config["timezones"][0])
+        return 0
+    now = time.time()
+    for tz_config in config["timezones"]:
+        business = BusinessCalendar(tz_config)
+        print(f"{tz_config['name']}: {business.render(now)} ({len(business.holidays)} holidays loaded)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+import argparse
+import array
+import bisect
+import collections
+import csv
+import mmap
+import os
+import struct
+import sys
+import time
+import unicodedata
+
+import pytz
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CITIES_FILE = os.path.join(HERE, "clock_cities.csv")
+INDEX_FILE = os.path.join(HERE, "clock_cities.idx")
+
+# Index layout: a header, then uint32 arrays and two blobs, each section 4-byte aligned.
+# The header holds the pytz version the zones came from and (offset, length) per section.
+MAGIC = b"CLKCITY1"
+HEADER = struct.Struct("=8s16s16I")
+SECTIONS = ("records", "record_offsets", "keys", "key_offsets", "key_entries", "grams", "gram_offsets", "postings")
+RECORD_SEPARATOR = "\x1f"
+# Trigrams are over folded text (space, a-z, 0-9), so each packs into one integer
+ALPHABET = " abcdefghijklmnopqrstuvwxyz0123456789"
+LETTER_CODES = {letter: code for code, letter in enumerate(ALPHABET)}
+# Trigram matches weaker than this (Jaccard similarity) are noise
+MIN_SIMILARITY = 0.3
+
+City = collections.namedtuple("City", "name timezone latitude longitude")
+
+
+def fold(text):
+    """Lower-case ASCII words separated by single spaces: "São Paulo" -> "sao paulo" """
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+    return " ".join("".join(letter if letter.isalnum() else " " for letter in text).split())
+
+
+def trigrams(key):
+    padded = f" {key} "
+    return {
+        (LETTER_CODES[padded[i]] * len(ALPHABET) + LETTER_CODES[padded[i + 1]]) * len(ALPHABET)
+        + LETTER_CODES[padded[i + 2]]
+        for i in range(len(padded) - 2)
+    }
+
+
+def parse_coordinates(text):
+    # ISO 6709 as zone.tab writes it: +DDMM+DDDMM or +DDMMSS+DDDMMSS
+    split = max(text.rfind("+"), text.rfind("-"))
+    values = []
+    for part, width in ((text[:split], 2), (text[split:], 3)):
+        digits = part[1:]
+        degrees = int(digits[:width]) + int(digits[width:width + 2]) / 60 + int(digits[width + 2:] or 0) / 3600
+        values.append(round(-degrees if part[0] == "-" else degrees, 2))
+    return values
+
+
+def load_entries(path=CITIES_FILE):
+    """[(display name, zone, latitude, longitude, search keys)] from the bundled cities and tzdb's zone.tab"""
+    countries = pytz.country_names
+    entries = []
+    seen = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            country = countries.get(row["country"].lower(), row["country"])
+            aliases = [alias for alias in row["aliases"].split("|") if alias]
+            entries.append((f"{row['city']}, {country}", row["timezone"], float(row["latitude"]),
+                            float(row["longitude"]), [row["city"], *aliases, country, row["timezone"]]))
+            seen[fold(row["city"]), row["timezone"]] = entries[-1]
+    with pytz.open_resource("zone.tab") as f:
+        lines = f.read().decode("utf-8").splitlines()
+    for line in lines:
+        if line.startswith("#") or not line.strip():
+            continue
+        fields = line.split("\t")
+        code, coordinates, zone = fields[:3]
+        city = zone.rsplit("/", 1)[-1].replace("_", " ")
+        if zone not in pytz.all_timezones_set:
+            continue
+        # The region comment ("Mountain (most areas)", ...) is searchable too
+        if (fold(city), zone) in seen:
+            seen[fold(city), zone][4].extend(fields[3:4])
+            continue
+        country = countries.get(code.lower(), code)
+        latitude, longitude = parse_coordinates(coordinates)
+        entries.append((f"{city}, {country}", zone, latitude, longitude, [city, country, zone] + fields[3:4]))
+    return entries
+
+
+def build_index(entries):
+    """Compile entries into the on-disk index format; returns bytes"""
+    records = [
+        RECORD_SEPARATOR.join((name, zone, f"{latitude:.2f}", f"{longitude:.2f}")).encode("utf-8")
+        for name, zone, latitude, longitude, _ in entries
+    ]
+    keys = sorted({(fold(key), entry) for entry, (*_, names) in enumerate(entries) for key in names if fold(key)})
+    postings = collections.defaultdict(list)
+    for key_id, (key, _) in enumerate(keys):
+        for gram in trigrams(key):
+            postings[gram].append(key_id)
+    grams = sorted(postings)
+
+    def offsets(blobs):
+        table = array.array("I", [0])
+        for blob in blobs:
+            table.append(table[-1] + len(blob))
+        return table
+
+    key_blobs = [key.encode("ascii") for key, _ in keys]
+    gram_offsets = array.array("I", [0])
+    flat = array.array("I")
+    for gram in grams:
+        flat.extend(postings[gram])
+        gram_offsets.append(len(flat))
+    sections = [
+        b"".join(records), offsets(records).tobytes(),
+        b"".join(key_blobs), offsets(key_blobs).tobytes(), array.array("I", [entry for _, entry in keys]).tobytes(),
+        array.array("I", grams).tobytes(), gram_offsets.tobytes(), flat.tobytes()
+    ]
+    layout = []
+    body = bytearray()
+    for section in sections:
+        body += b"\0" * (-(HEADER.size + len(body)) % 4)
+        layout += [HEADER.size + len(body), len(section)]
+        body += section
+    return HEADER.pack(MAGIC, pytz.__version__.encode("ascii"), *layout) + bytes(body)
+
+
+class CityIndex:
+    """Fuzzy city/country/alias search over a compiled index, read in place.
+
+    Opening maps the file; nothing is parsed up front. Prefix matches come from a bisect
+    over the sorted keys, misspellings and inner words from trigram posting lists.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        view = memoryview(data)
+        magic, version, *layout = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError("not a city index")
+        self.version = version.rstrip(b"\0").decode("ascii")
+        self.views = [view]
+        for name, start, length in zip(SECTIONS, layout[::2], layout[1::2]):
+            section = view[start:start + length]
+            if name not in ("records", "keys"):
+                section = section.cast("I")
+            self.views.append(section)
+            setattr(self, name, section)
+
+    @classmethod
+    def map(cls, path):
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return cls(mapped)
+        except (ValueError, struct.error):
+            mapped.close()
+            raise ValueError(f"{path} is not a city index")
+
+    def close(self):
+        for view in reversed(self.views):
+            view.release()
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def key(self, key_id):
+        return bytes(self.keys[self.key_offsets[key_id]:self.key_offsets[key_id + 1]])
+
+    def city(self, entry):
+        record = bytes(self.records[self.record_offsets[entry]:self.record_offsets[entry + 1]]).decode("utf-8")
+        name, zone, latitude, longitude = record.split(RECORD_SEPARATOR)
+        return City(name, zone, float(latitude), float(longitude))
+
+    def search(self, query, limit=10):
+        """Best matching cities, best first; at most one result per city"""
+        query = fold(query)
+        if not query:
+            return []
+        scores = {}
+        wanted = query.encode("ascii")
+        key_count = len(self.key_entries)
+        # Keys starting with the query outrank fuzzy matches; an exact key outranks both
+        key_id = bisect.bisect_left(range(key_count), wanted, key=self.key)
+        while key_id < key_count and len(scores) < limit * 4:
+            key = self.key(key_id)
+            if not key.startswith(wanted):
+                break
+            entry = self.key_entries[key_id]
+            scores[entry] = max(scores.get(entry, 0), 3 if key == wanted else 2 + len(wanted) / len(key))
+            key_id += 1
+        grams = trigrams(query)
+        shared = collections.Counter()
+        for gram in grams:
+            index = bisect.bisect_left(self.grams, gram)
+            if index < len(self.grams) and self.grams[index] == gram:
+                shared.update(self.postings[self.gram_offsets[index]:self.gram_offsets[index + 1]])
+        for key_id, count in shared.items():
+            # A padded key of n letters has about n trigrams
+            key_length = self.key_offsets[key_id + 1] - self.key_offsets[key_id]
+            similarity = count / (len(grams) + key_length - count)
+            if similarity >= MIN_SIMILARITY:
+                entry = self.key_entries[key_id]
+                scores[entry] = max(scores.get(entry, 0), similarity)
+        best = sorted(scores, key=lambda entry: (-scores[entry], entry))[:limit]
+        return [self.city(entry) for entry in best]
+
+
+def open_index(path=INDEX_FILE, source=CITIES_FILE):
+    """Map the compiled index, compiling it first when it is missing or older than its sources"""
+    try:
+        if os.path.getmtime(path) >= os.path.getmtime(source):
+            index = CityIndex.map(path)
+            if index.version == pytz.__version__:
+                return index
+            index.close()
+    except (OSError, ValueError):
+        pass
+    data = build_index(load_entries(source))
+    try:
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+        return CityIndex.map(path)
+    except (OSError, ValueError) as e:
+        # A read-only install still gets search, straight from the compiled bytes
+        print(f"Error writing city index {path}: {e}")
+        return CityIndex(data)
+
+
+def benchmark(index, queries=("chennai", "new yrok", "sao paulo", "kiev", "germany", "pacific", "zur", "a")):
+    for query in queries:
+        started = time.perf_counter()
+        for _ in range(100):
+            results = index.search(query)
+        elapsed = (time.perf_counter() - started) / 100
+        top = results[0].name if results else "-"
+        print(f"{query!r:>12}: {elapsed * 1000:.2f} ms, {len(results)} results, top {top}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search the bundled city/country/alias index for a timezone")
+    parser.add_argument("query", nargs="*", help="city, country or alias (fuzzy)")
+    parser.add_argument("--build", action="store_true", help="recompile the index from its sources")
+    parser.add_argument("--bench", action="store_true", help="time a few typical queries")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+    if args.build and os.path.exists(INDEX_FILE):
+        os.remove(INDEX_FILE)
+    started = time.perf_counter()
+    index = open_index()
+    print(f"index ready in {(time.perf_counter() - started) * 1000:.1f} ms: "
+          f"{len(index.record_offsets) - 1} cities, {len(index.key_entries)} keys, {len(index.grams)} trigrams")
+    if args.bench:
+        benchmark(index)
+    if args.query:
+        for city in index.search(" ".join(args.query), args.limit):
+            print(f"{city.name:<40} {city.timezone:<32} {city.latitude:7.2f} {city.longitude:8.2f}")
+    index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
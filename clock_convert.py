@@ -0,0 +1,235 @@
+import argparse
+import calendar
+import collections
+import functools
+import mmap
+import multiprocessing
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+import pytz
+
+from clock_engine import (
+    OffsetTable, SUBSECOND_MARK, bind_zone_directives, load_config_file, mark_subsecond, splice_fraction
+)
+
+# ISO 8601 date-times (naive ones are taken as UTC) and Unix epochs in seconds or milliseconds.
+# Both start with 1 or 2; the leading lookahead rejects every other position before the
+# alternation is tried, which doubles scan speed on typical log text.
+SCANNER = re.compile(
+    rb"(?=[12])(?:"
+    rb"(?<!\d)(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})(?:[.,](\d{1,9}))?(Z|[+-]\d{2}:?\d{2})?"
+    rb"|(?<![\d.])(1\d{9})(?:\.(\d{1,9})|(\d{3}))?(?!\d))"
+)
+DEFAULT_FORMAT = "%Y-%m-%d %H:%M:%S %Z"
+CHUNK_SIZE = 4 * 1024 * 1024
+
+# Set per process by init_worker: the target zones and the mapped input
+ZONES = []
+SEPARATOR = " / "
+MAPPED = None
+
+
+class TargetZone:
+    """One output zone: transition table built once per process, rendering cached per second"""
+
+    def __init__(self, timezone, fmt):
+        self.table = None if timezone == "local" else OffsetTable(pytz.timezone(timezone))
+        self.pattern, self.subsecond = mark_subsecond(fmt)
+        self.formats = {}
+        self.render_second = functools.lru_cache(maxsize=4096)(self._render_second)
+
+    def _render_second(self, second):
+        # Log lines cluster in time, so most timestamps hit the cache of their second
+        if self.table is None:
+            return tuple(time.strftime(self.pattern, time.localtime(second)).split(SUBSECOND_MARK))
+        start, end, offset, name = self.table.period(second)
+        fmt = self.formats.get((offset, name))
+        if fmt is None:
+            fmt = self.formats[offset, name] = bind_zone_directives(self.pattern, offset, name)
+        return tuple(time.strftime(fmt, time.gmtime(second + offset)).split(SUBSECOND_MARK))
+
+    def render(self, second, fraction):
+        parts = self.render_second(second)
+        if len(parts) == 1:
+            return parts[0]
+        return splice_fraction(parts, self.subsecond, fraction)
+
+
+def init_worker(path, zones, separator):
+    global ZONES, SEPARATOR, MAPPED
+    ZONES = [TargetZone(timezone, fmt) for timezone, fmt in zones]
+    SEPARATOR = separator
+    if path is not None:
+        with open(path, "rb") as f:
+            MAPPED = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def parse_offset(text):
+    if text == b"Z":
+        return 0
+    sign = -1 if text[:1] == b"-" else 1
+    digits = text[1:].replace(b":", b"")
+    return sign * (int(digits[:2]) * 3600 + int(digits[2:]) * 60)
+
+
+def replace(match):
+    year, month, day, hour, minute, second, fraction, designator, epoch, epoch_fraction, millis = match.groups()
+    if epoch is not None:
+        instant = int(epoch)
+        if millis is not None:
+            fraction = millis
+        else:
+            fraction = epoch_fraction
+    else:
+        year, month, day = int(year), int(month), int(day)
+        hour, minute, second = int(hour), int(minute), int(second)
+        if not (1 <= month <= 12 and 1 <= day <= 31 and hour < 24 and minute < 60 and second < 61):
+            return match.group(0)
+        # timegm would roll 2024-02-31 over into March; impossible dates are left as they are
+        if day > 28 and day > calendar.monthrange(year, month)[1]:
+            return match.group(0)
+        instant = calendar.timegm((year, month, day, hour, minute, second))
+        if designator:
+            instant -= parse_offset(designator)
+    fraction = int(fraction) / 10 ** len(fraction) if fraction else 0.0
+    return SEPARATOR.join(zone.render(instant, fraction) for zone in ZONES).encode("utf-8")
+
+
+def convert_bytes(data):
+    return SCANNER.sub(replace, data)
+
+
+def convert_span(span):
+    start, end = span
+    return convert_bytes(MAPPED[start:end])
+
+
+def spans(mapped, chunk_size):
+    """Yield (start, end) ranges of about chunk_size bytes that end on a line break"""
+    size = len(mapped)
+    start = 0
+    while start < size:
+        end = mapped.find(b"\n", min(start + chunk_size, size) - 1)
+        end = size if end < 0 else end + 1
+        yield start, end
+        start = end
+
+
+def target_zones(config, names, fmt):
+    zones = config["timezones"]
+    if names:
+        known = {zone["name"]: zone for zone in zones}
+        missing = [name for name in names if name not in known]
+        if missing:
+            raise ValueError(f"no configured zone named {', '.join(missing)}")
+        zones = [known[name] for name in names]
+    return [(zone["timezone"], fmt) for zone in zones]
+
+
+def convert_file(path, out, zones, separator=SEPARATOR, workers=None, chunk_size=CHUNK_SIZE):
+    """Rewrite every timestamp in `path` into `out`; returns bytes read.
+
+    Chunks are converted in a process pool and written in input order. At most two chunks per
+    worker are in flight, so memory stays bounded by the chunk size, not the file size.
+    """
+    workers = workers or os.cpu_count() or 1
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return 0
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        if workers == 1:
+            init_worker(None, zones, separator)
+            for start, end in spans(mapped, chunk_size):
+                out.write(convert_bytes(mapped[start:end]))
+            return len(mapped)
+        with multiprocessing.Pool(workers, init_worker, (path, zones, separator)) as pool:
+            pending = collections.deque()
+            for span in spans(mapped, chunk_size):
+                pending.append(pool.apply_async(convert_span, (span,)))
+                if len(pending) >= 2 * workers:
+                    out.write(pending.popleft().get())
+            while pending:
+                out.write(pending.popleft().get())
+        return len(mapped)
+    finally:
+        mapped.close()
+
+
+def write_sample_log(path, megabytes, seed=1):
+    rng = random.Random(seed)
+    instant = time.time() - 86400 * 120
+    target = megabytes * 1024 * 1024
+    written = 0
+    with open(path, "w") as f:
+        while written < target:
+            lines = []
+            for _ in range(1000):
+                instant += rng.random() * 2
+                stamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(instant))
+                if rng.random() < 0.3:
+                    lines.append(f"{int(instant * 1000)} worker-{rng.randrange(16)} heartbeat ok\n")
+                else:
+                    lines.append(f"{stamp}.{rng.randrange(1000):03d}Z INFO request id={rng.randrange(10**9)} "
+                                 f"path=/api/v1/items/{rng.randrange(10**6)} status=200 took={rng.random():.3f}s\n")
+            block = "".join(lines)
+            f.write(block)
+            written += len(block)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rewrite epoch/ISO timestamps in a log into the configured zones")
+    parser.add_argument("input", nargs="?", help="log file to convert")
+    parser.add_argument("-o", "--output", help="write here instead of stdout")
+    parser.add_argument("--config", default="clock_config.json", help="path to clock_config.json")
+    parser.add_argument("--zone", action="append", help="configured zone name to render (repeatable; default all)")
+    parser.add_argument("--format", default=DEFAULT_FORMAT, help="strftime format, %%f/%%L keep the fraction")
+    parser.add_argument("--separator", default=SEPARATOR, help="placed between zones when rendering several")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-mb", type=float, default=CHUNK_SIZE / 1024 / 1024, help="chunk size in MB")
+    parser.add_argument("--bench", type=int, metavar="MB", help="convert a generated log of this size to /dev/null")
+    args = parser.parse_args(argv)
+
+    config = load_config_file(args.config)
+    try:
+        zones = target_zones(config, args.zone, args.format)
+    except (ValueError, pytz.UnknownTimeZoneError) as e:
+        parser.error(str(e))
+    chunk_size = max(1024, int(args.chunk_mb * 1024 * 1024))
+
+    path = args.input
+    if args.bench:
+        path = os.path.join(tempfile.gettempdir(), "clock_convert_bench.log")
+        write_sample_log(path, args.bench)
+    elif not path:
+        parser.error("an input file is required unless --bench is given")
+
+    if args.bench:
+        out = open(os.devnull, "wb")
+    elif args.output:
+        out = open(args.output, "wb")
+    else:
+        out = sys.stdout.buffer
+    started = time.perf_counter()
+    try:
+        size = convert_file(path, out, zones, args.separator, args.workers, chunk_size)
+    except BrokenPipeError:
+        sys.stderr.close()
+        return 0
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+        if args.bench:
+            os.remove(path)
+    elapsed = time.perf_counter() - started
+    print(f"{size / 1e6:.1f} MB in {elapsed:.2f}s: {size / 1e6 / max(elapsed, 1e-9):.1f} MB/s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
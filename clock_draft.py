@@ -0,0 +1,142 @@
+import argparse
+import collections
+import copy
+import sys
+import time
+
+from clock_engine import load_config_file
+
+# settings: {top-level key: new value} for keys that differ from the live config
+# zones: the new zone list, or None when it is the live zones in the live order
+# changed: {index: keys} for zones edited in place (same position as the zone they were copied from)
+ConfigDiff = collections.namedtuple("ConfigDiff", "settings zones changed")
+
+
+class ConfigDraft:
+    """An edit of a config that shares everything it has not changed.
+
+    Zones are a tuple of the live zone dicts. Editing a zone copies only that dict, and
+    every edit builds a new tuple of references, so a state is just (zones, settings)
+    and undo/redo history never deep-copies. Cancel is dropping the draft.
+    """
+
+    def __init__(self, config, history_limit=100):
+        self.base = config
+        self.zones = tuple(config["timezones"])
+        self.settings = {}
+        # id(copy) -> (copy, the live zone it was first copied from)
+        self.origins = {}
+        self.undo_stack = []
+        self.redo_stack = []
+        self.history_limit = history_limit
+
+    def get(self, key):
+        return self.settings[key] if key in self.settings else self.base[key]
+
+    def origin(self, zone):
+        return self.origins.get(id(zone), (None, zone))[1]
+
+    def push(self):
+        self.undo_stack.append((self.zones, self.settings))
+        del self.undo_stack[:-self.history_limit]
+        self.redo_stack.clear()
+
+    def update(self, values):
+        """Set top-level settings; returns True if any differed"""
+        changed = {key: value for key, value in values.items() if self.get(key) != value}
+        if not changed:
+            return False
+        self.push()
+        self.settings = dict(self.settings, **changed)
+        return True
+
+    def update_zone(self, index, values):
+        """Set keys of one zone, copying it on the first real change; returns True if any differed"""
+        zone = self.zones[index]
+        changed = {key: value for key, value in values.items() if zone.get(key) != value}
+        if not changed:
+            return False
+        self.push()
+        copy = dict(zone, **changed)
+        self.origins[id(copy)] = (copy, self.origin(zone))
+        self.zones = self.zones[:index] + (copy,) + self.zones[index + 1:]
+        return True
+
+    def add_zone(self, zone):
+        self.push()
+        self.zones += (zone,)
+
+    def remove_zone(self, index):
+        self.push()
+        self.zones = self.zones[:index] + self.zones[index + 1:]
+
+    def undo(self):
+        if not self.undo_stack:
+            return False
+        self.redo_stack.append((self.zones, self.settings))
+        self.zones, self.settings = self.undo_stack.pop()
+        return True
+
+    def redo(self):
+        if not self.redo_stack:
+            return False
+        self.undo_stack.append((self.zones, self.settings))
+        self.zones, self.settings = self.redo_stack.pop()
+        return True
+
+    def settled(self, zone):
+        # A zone edited back to its original values is the original again
+        origin = self.origin(zone)
+        return origin if zone is not origin and zone == origin else zone
+
+    def diff(self):
+        """The minimal ConfigDiff against the live config, or None if nothing changed"""
+        settings = {key: value for key, value in self.settings.items() if self.base.get(key) != value}
+        live = self.base["timezones"]
+        zones = [self.settled(zone) for zone in self.zones]
+        changed = {}
+        if len(zones) == len(live) and all(zone is live_zone for zone, live_zone in zip(zones, live)):
+            zones = None
+        else:
+            for index, zone in enumerate(zones):
+                origin = self.origin(zone)
+                if zone is not origin and index < len(live) and live[index] is origin:
+                    changed[index] = {key for key in zone.keys() | origin.keys() if zone.get(key) != origin.get(key)}
+        if not settings and zones is None:
+            return None
+        return ConfigDiff(settings, zones, changed)
+
+
+def benchmark(config, edits=1000):
+    # Each edit recolours one zone; the draft keeps every state for undo
+    zones = len(config["timezones"])
+    started = time.perf_counter()
+    draft = ConfigDraft(config, history_limit=edits)
+    for edit in range(edits):
+        draft.update_zone(edit % zones, {"color": f"#{edit:06x}"})
+    diff = draft.diff()
+    while draft.undo():
+        pass
+    elapsed = time.perf_counter() - started
+    started = time.perf_counter()
+    [copy.deepcopy(config["timezones"]) for _ in range(edits)]
+    copied = time.perf_counter() - started
+    print(f"{edits} edits of {zones} zones, diff and full undo: {elapsed * 1000:.1f} ms "
+          f"({len(diff.changed)} zones changed); deep-copied history: {copied * 1000:.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time settings edits through a draft against deep copies")
+    parser.add_argument("--config", default="clock_config.json", help="path to clock_config.json")
+    parser.add_argument("--bench", action="store_true", help="time draft edits, diff and undo against deep copies")
+    parser.add_argument("--edits", type=int, default=1000, help="edits to make with --bench")
+    args = parser.parse_args(argv)
+    if not args.bench:
+        parser.print_help()
+        return 0
+    benchmark(load_config_file(args.config), args.edits)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+import argparse
+import bisect
+import collections
+import math
+import sys
+import time
+
+import pytz
+
+from clock_engine import DEFAULT_ZONE, OffsetTable, load_config_file
+
+DAY = 86400
+# Offsets change at most a few times a year, so stepping the local zone this coarsely misses none
+LOCAL_STEP = 6 * 3600
+
+Transition = collections.namedtuple("Transition", "instant name before after before_name after_name")
+
+
+def local_offset(now):
+    moment = time.localtime(now)
+    return moment.tm_gmtoff, moment.tm_zone
+
+
+def local_transitions(name, start, end):
+    """Offset changes of the system zone in [start, end), found by stepping and then bisecting"""
+    found = []
+    low = start
+    offset, abbreviation = local_offset(low)
+    while low < end:
+        high = min(low + LOCAL_STEP, end)
+        new_offset, new_abbreviation = local_offset(high)
+        if new_offset != offset:
+            while high - low > 1:
+                middle = (low + high) // 2
+                if local_offset(middle)[0] == offset:
+                    low = middle
+                else:
+                    high = middle
+            found.append(Transition(high, name, offset, new_offset, abbreviation, new_abbreviation))
+            offset, abbreviation = new_offset, new_abbreviation
+        low = high
+    return found
+
+
+def zone_transitions(tz_config, start, end):
+    """Offset changes of one configured zone in [start, end), read off its OffsetTable"""
+    tz_config = dict(DEFAULT_ZONE, **tz_config)
+    name = tz_config["name"]
+    if tz_config["scale"] != "utc":
+        # TAI/GPS have no civil offset changes (leap seconds are not announced as clock changes)
+        return []
+    if tz_config["timezone"] == "local":
+        return local_transitions(name, int(start), int(end))
+    table = OffsetTable(pytz.timezone(tz_config["timezone"]))
+    found = []
+    index = bisect.bisect_right(table.starts, start)
+    while index < len(table.starts) and table.starts[index] < end:
+        # Abbreviation-only changes (and the first LMT period) are not clock changes
+        (before, before_name), (after, after_name) = table.periods[max(0, index - 1)], table.periods[index]
+        if index and before != after:
+            found.append(Transition(table.starts[index], name, before, after, before_name, after_name))
+        index += 1
+    return found
+
+
+def format_shift(seconds):
+    hours, minutes = divmod(abs(seconds) // 60, 60)
+    if not minutes:
+        return "1 hour" if hours == 1 else f"{hours} hours"
+    if not hours:
+        return f"{minutes} minutes"
+    return f"{hours}h {minutes:02d}m"
+
+
+def describe(transition, short=False):
+    """What happens, in the zone's own wall time just before the change"""
+    wall = time.gmtime(transition.instant + transition.before)
+    if short:
+        return f"{transition.name} {transition.before_name}→{transition.after_name} " \
+               f"{time.strftime('%d %b', wall)}"
+    direction = "forward" if transition.after > transition.before else "back"
+    return (f"{transition.name}: clocks go {direction} {format_shift(transition.after - transition.before)} "
+            f"on {time.strftime('%a %d %b at %H:%M', wall)} ({transition.before_name} → {transition.after_name})")
+
+
+class TransitionLookahead:
+    """Upcoming offset changes of all configured zones within `horizon_days`.
+
+    One sorted index is built per config and per window, so nothing scans per tick. The
+    index covers twice the horizon; it re-arms (rebuilds) only when its first transition
+    passes or the end of that window comes within the horizon.
+    """
+
+    def __init__(self, zones, horizon_days=30):
+        self.zones = zones
+        self.horizon = horizon_days * DAY
+        self.transitions = []
+        self.instants = []
+        self.rearm_at = -math.inf
+
+    def arm(self, now):
+        found = []
+        for tz_config in self.zones:
+            try:
+                found.extend(zone_transitions(tz_config, now, now + 2 * self.horizon))
+            except pytz.UnknownTimeZoneError:
+                continue
+        self.transitions = sorted(found)
+        self.instants = [transition.instant for transition in self.transitions]
+        self.rearm_at = now + self.horizon
+        if self.transitions:
+            self.rearm_at = min(self.rearm_at, self.instants[0])
+
+    def check(self, now):
+        """Rebuild if the index has expired; returns True when it did"""
+        if now < self.rearm_at:
+            return False
+        self.arm(now)
+        return True
+
+    def upcoming(self, now):
+        self.check(now)
+        first = bisect.bisect_left(self.instants, now)
+        last = bisect.bisect_left(self.instants, now + self.horizon)
+        return self.transitions[first:last]
+
+    def next_notice(self, now, notify_days, notified):
+        """(instant to notify at, transition) for the first transition not yet in `notified`"""
+        for transition in self.upcoming(now):
+            if transition not in notified:
+                return max(now, transition.instant - notify_days * DAY), transition
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List upcoming clock changes in the configured zones")
+    parser.add_argument("--config", default="clock_config.json", help="path to clock_config.json")
+    parser.add_argument("--days", type=int, help="horizon in days (default from the config)")
+    args = parser.parse_args(argv)
+    config = load_config_file(args.config)
+    days = args.days or config["dst_alerts"]["horizon_days"]
+    started = time.perf_counter()
+    lookahead = TransitionLookahead(config["timezones"], days)
+    upcoming = lookahead.upcoming(time.time())
+    elapsed = time.perf_counter() - started
+    for transition in upcoming:
+        print(describe(transition))
+    if not upcoming:
+        print(f"No clock changes in the next {days} days")
+    print(f"({len(config['timezones'])} zones indexed in {elapsed * 1000:.1f} ms)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,706 @@
+import re
+import copy
+import json
+import time
+import math
+import bisect
+import calendar
+import locale
+import importlib
+import threading
+from datetime import datetime
+
+import pytz
+
+FALLBACK_FORMAT = "%H:%M:%S\n%d-%m-%Y"
+
+DEFAULT_ZONE = {
+    "name": "Local",
+    "timezone": "local",
+    "font_family": "Segoe UI",
+    "font_size": 12,
+    "datetime_format": FALLBACK_FORMAT,
+    "color": "white",
+    "locale": "",
+    # "utc" is civil time in `timezone`; "tai" and "gps" render those scales instead
+    "scale": "utc",
+    # Working hours in the zone's own wall time, used by the meeting planner
+    "work_start": "09:00",
+    "work_end": "17:00",
+    "work_days": [0, 1, 2, 3, 4],
+    # ICS/CSV holiday files for the %{business} field
+    "holidays": [],
+    # Decimal degrees (north and east positive) for %{sun}, %{sunrise} and %{sunset}
+    "latitude": None,
+    "longitude": None
+}
+
+# Extra overlay windows; "zones" lists zone names to show (all zones when omitted)
+WINDOW_DEFAULTS = {
+    "position": "topleft",
+    "custom_x": 50,
+    "custom_y": 50,
+    "monitor": 0,
+    "layout": "auto"
+}
+
+DEFAULT_CONFIG = {
+    "position": "topleft",
+    "custom_x": 50,
+    "custom_y": 50,
+    "visible": True,
+    "position_x": 50,
+    "position_y": 50,
+    "layout": "auto",
+    "subsecond_fps": 10,
+    "timezones": [dict(DEFAULT_ZONE)],
+    # Named zone sets; the active one ("profile") is the same list as "timezones"
+    "profile": "",
+    "profiles": {},
+    "windows": [],
+    "timers": [],
+    "server": {
+        "enabled": False,
+        "host": "127.0.0.1",
+        "port": 8765,
+        "unix_socket": ""
+    },
+    "shared_buffer": {
+        "enabled": False,
+        "path": ""
+    },
+    "ntp": {
+        "enabled": False,
+        "server": "pool.ntp.org",
+        "port": 123,
+        "min_interval": 64,
+        "max_interval": 1024,
+        "display": True,
+        "apply": False
+    },
+    "dst_alerts": {
+        "enabled": True,
+        "horizon_days": 30,
+        "notify_days": 3
+    }
+}
+
+# Granularity (seconds) a format needs to stay correct, keyed by the strftime directive letter;
+# a letter not listed here might change any second
+DIRECTIVE_RESOLUTION = {}
+DAY = 86400
+for letters, seconds in (("STXcrsfL", 1), ("MR", 60), ("HIpPkl", 3600), ("aAbBhdejmUWVGguwyYCDFxzZnt%", DAY)):
+    for letter in letters:
+        DIRECTIVE_RESOLUTION[letter] = seconds
+
+# Padding/case flags (glibc %-H %_H %0H %^a, Windows %#H) and E/O modifiers come before the letter
+DIRECTIVE_RE = re.compile(r"%[-#_0^EO]*(.)")
+
+# Sub-second directives (microseconds as in datetime, milliseconds) and their digit counts.
+# time.strftime knows neither; they are swapped for a marker and spliced in after formatting.
+SUBSECOND_DIGITS = {"f": 6, "L": 3}
+SUBSECOND_MARK = "\x1f"
+REFRESH_RATES = (10, 30, 60)
+
+# Extension fields %{name}: a factory takes the zone's tz_config and returns an object with
+# render(now) and resolution (seconds); fields that change off any regular grid can also give
+# next_change(now). samples(now) lists texts the field can show (any digit standing for every
+# digit) so stable layout can reserve the widest. The modules below register theirs when first needed.
+EXTENSION_RE = re.compile(r"%%|%\{(\w+)\}")
+EXTENSION_MARK = "\x1e"
+EXTENSION_MODULES = ("clock_calendar", "clock_sun", "clock_scales", "clock_relative")
+EXTENSIONS = {}
+# Distinct offset periods looked at when sizing %z/%Z for stable layout
+LAYOUT_PERIODS = 64
+# Time scales other than civil UTC: a factory returns an object with `table` (period/utcoffset
+# like OffsetTable) and `epoch`
+TIME_SCALES = {}
+
+
+BOOTTIME = getattr(time, "CLOCK_BOOTTIME", None)
+
+
+class SystemClock:
+    """The real clocks; the default clock source everywhere"""
+
+    def time(self):
+        return time.time()
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def uptime(self):
+        # Monotonic but still counting through suspend; Linux's monotonic clock stops while asleep
+        if BOOTTIME is not None:
+            return time.clock_gettime(BOOTTIME)
+        return time.monotonic()
+
+    def perf_counter(self):
+        return time.perf_counter()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class VirtualClock:
+    """A clock that only moves when told to, for replaying ticks faster than real time"""
+
+    def __init__(self, start=0.0):
+        self.wall = float(start)
+        self.elapsed = 0.0
+
+    def time(self):
+        return self.wall
+
+    def monotonic(self):
+        return self.elapsed
+
+    perf_counter = uptime = monotonic
+
+    def advance(self, seconds):
+        self.wall += seconds
+        self.elapsed += seconds
+
+    sleep = advance
+
+    def step(self, seconds):
+        """Move wall time only, like an NTP step or a manual clock change"""
+        self.wall += seconds
+
+
+SYSTEM_CLOCK = SystemClock()
+
+
+class OffsetClock:
+    """Another clock source with a correction added to its wall time, e.g. an NTP offset"""
+
+    def __init__(self, clock=SYSTEM_CLOCK, offset=0.0):
+        self.clock = clock
+        self.offset = offset
+
+    def time(self):
+        return self.clock.time() + self.offset
+
+    def monotonic(self):
+        return self.clock.monotonic()
+
+    def uptime(self):
+        return getattr(self.clock, "uptime", self.clock.monotonic)()
+
+    def perf_counter(self):
+        return self.clock.perf_counter()
+
+    def sleep(self, seconds):
+        self.clock.sleep(seconds)
+
+
+def default_config():
+    return copy.deepcopy(DEFAULT_CONFIG)
+
+
+def fill_defaults(config):
+    """Add any keys missing from a loaded config, in place"""
+    for key, value in DEFAULT_CONFIG.items():
+        if key not in config:
+            config[key] = copy.deepcopy(value)
+        elif isinstance(value, dict) and isinstance(config[key], dict):
+            for sub_key, sub_value in value.items():
+                config[key].setdefault(sub_key, copy.deepcopy(sub_value))
+    for zones in [config["timezones"]] + list(config["profiles"].values()):
+        for tz in zones:
+            for key, value in DEFAULT_ZONE.items():
+                if key not in tz:
+                    tz[key] = value
+    if config["profile"] in config["profiles"]:
+        config["profiles"][config["profile"]] = config["timezones"]
+    return config
+
+
+def load_config_file(path):
+    """Read a config without the Tk app, falling back to defaults if missing or invalid"""
+    try:
+        with open(path, 'r') as f:
+            return fill_defaults(json.load(f))
+    except (json.JSONDecodeError, FileNotFoundError):
+        return default_config()
+
+
+def format_resolution(fmt):
+    resolution = DAY
+    for letter in DIRECTIVE_RE.findall(fmt):
+        resolution = min(resolution, DIRECTIVE_RESOLUTION.get(letter, 1))
+    return resolution
+
+
+LOCALE_LOCK = threading.Lock()
+LOCALE_TABLES = {}
+NAME_DIRECTIVES = "aAbBp"
+
+
+def mark_subsecond(fmt):
+    """Return (format with sub-second directives replaced by markers, digit count per marker)"""
+    digits = []
+
+    def substitute(match):
+        code = match.group(1)
+        if code in SUBSECOND_DIGITS:
+            digits.append(SUBSECOND_DIGITS[code])
+            return SUBSECOND_MARK
+        return match.group(0)
+    return DIRECTIVE_RE.sub(substitute, fmt), digits
+
+
+def splice_fraction(parts, digits, fraction):
+    micro = f"{int(fraction * 1000000):06d}"
+    pieces = [parts[0]]
+    for part, count in zip(parts[1:], digits):
+        pieces.append(micro[:count])
+        pieces.append(part)
+    return "".join(pieces)
+
+
+def register_extension(name, factory):
+    EXTENSIONS[name] = factory
+
+
+def register_time_scale(name, factory):
+    TIME_SCALES[name] = factory
+
+
+def load_extensions():
+    for module in EXTENSION_MODULES:
+        importlib.import_module(module)
+
+
+def time_scale_names():
+    load_extensions()
+    return ["utc"] + sorted(TIME_SCALES)
+
+
+def bind_extensions(fmt, tz_config):
+    """Return (format with %{name} fields replaced by markers, the field objects in order)"""
+    fields = []
+
+    def substitute(match):
+        name = match.group(1)
+        if name is None:
+            return match.group(0)
+        if name not in EXTENSIONS:
+            load_extensions()
+        factory = EXTENSIONS.get(name)
+        if factory is None:
+            # Unknown fields stay visible as typed
+            return "%%{" + name + "}"
+        fields.append(factory(tz_config))
+        return EXTENSION_MARK
+    return EXTENSION_RE.sub(substitute, fmt), fields
+
+
+def splice_fields(text, fields, now):
+    return splice_parts(text.split(EXTENSION_MARK), fields, now)
+
+
+def splice_parts(parts, fields, now):
+    pieces = [parts[0]]
+    for part, field in zip(parts[1:], fields):
+        pieces.append(field.render(now))
+        pieces.append(part)
+    return "".join(pieces)
+
+
+def frame_boundary(now, fps):
+    """Next frame on a fixed 1/fps grid; scheduling to it caps the refresh rate at fps"""
+    return (math.floor(now * fps) + 1) / fps
+
+
+def locale_candidates(name):
+    yield name
+    if "." not in name:
+        yield name + ".UTF-8"
+        yield name + ".utf8"
+    if "_" in name:
+        yield name.replace("_", "-")
+
+
+def locale_names(name):
+    """Weekday, month and AM/PM names for a locale, built once and shared by every zone.
+
+    setlocale is process-global and not thread-safe, so it is only touched here, under a lock,
+    the first time a locale is asked for. Returns None if the locale isn't installed.
+    """
+    with LOCALE_LOCK:
+        if name in LOCALE_TABLES:
+            return LOCALE_TABLES[name]
+        saved = locale.setlocale(locale.LC_TIME), locale.setlocale(locale.LC_CTYPE)
+        table = None
+        try:
+            for candidate in locale_candidates(name):
+                try:
+                    locale.setlocale(locale.LC_TIME, candidate)
+                    locale.setlocale(locale.LC_CTYPE, candidate)
+                except locale.Error:
+                    continue
+                # 2024-01-01 is a Monday, matching tm_wday == 0
+                days = [time.struct_time((2024, 1, 1 + day, 0, 0, 0, day, 1 + day, 0)) for day in range(7)]
+                months = [time.struct_time((2024, month, 1, 0, 0, 0, 0, 1, 0)) for month in range(1, 13)]
+                halves = [time.struct_time((2024, 1, 1, hour, 0, 0, 0, 1, 0)) for hour in (0, 12)]
+                table = {
+                    "a": [time.strftime("%a", moment) for moment in days],
+                    "A": [time.strftime("%A", moment) for moment in days],
+                    "b": [time.strftime("%b", moment) for moment in months],
+                    "B": [time.strftime("%B", moment) for moment in months],
+                    "p": [time.strftime("%p", moment) for moment in halves]
+                }
+                break
+        finally:
+            locale.setlocale(locale.LC_TIME, saved[0])
+            locale.setlocale(locale.LC_CTYPE, saved[1])
+        if table is None:
+            print(f"Locale {name!r} is not available, using the system locale")
+        LOCALE_TABLES[name] = table
+        return table
+
+
+def bind_name_directives(fmt, names, weekday, month, afternoon):
+    # Replace %a %A %b %B %p with this locale's names so one strftime call renders the rest
+    def substitute(match):
+        code = match.group(1)
+        if code not in NAME_DIRECTIVES:
+            return match.group(0)
+        if code in "aA":
+            value = names[code][weekday]
+        elif code in "bB":
+            value = names[code][month - 1]
+        else:
+            value = names[code][1 if afternoon else 0]
+        if "^" in match.group(0):
+            value = value.upper()
+        return value.replace("%", "%%")
+    return DIRECTIVE_RE.sub(substitute, fmt)
+
+
+class OffsetTable:
+    """UTC offset periods of a pytz zone, found by bisect over its transition instants"""
+
+    def __init__(self, tz):
+        transitions = getattr(tz, "_utc_transition_times", None)
+        if transitions:
+            self.starts = [calendar.timegm(moment.timetuple()) for moment in transitions]
+            self.periods = [(int(offset.total_seconds()), name) for offset, dst, name in tz._transition_info]
+        else:
+            reference = datetime(2000, 1, 1)
+            self.starts = [-math.inf]
+            self.periods = [(int(tz.utcoffset(reference).total_seconds()), tz.tzname(reference))]
+
+    def period(self, now):
+        """Return (start, end, offset seconds, abbreviation) of the period containing `now`"""
+        index = max(0, bisect.bisect_right(self.starts, now) - 1)
+        end = self.starts[index + 1] if index + 1 < len(self.starts) else math.inf
+        offset, name = self.periods[index]
+        return self.starts[index], end, offset, name
+
+    def utcoffset(self, now):
+        index = max(0, bisect.bisect_right(self.starts, now) - 1)
+        return self.periods[index][0]
+
+
+def format_offset_compact(seconds):
+    return format_offset(seconds).replace(":", "")
+
+
+def bind_zone_directives(fmt, offset, name):
+    # %z and %Z are fixed for a whole offset period, so they are substituted in ahead of time
+    def substitute(match):
+        code = match.group(1)
+        if code == "z":
+            return format_offset_compact(offset)
+        if code == "Z":
+            return name.replace("%", "%%")
+        return match.group(0)
+    return DIRECTIVE_RE.sub(substitute, fmt)
+
+
+class ZoneRenderer:
+    """One configured zone with its tzinfo resolved and format compiled once"""
+
+    def __init__(self, tz_config):
+        self.name = tz_config["name"]
+        self.config = tz_config
+        self.format = tz_config["datetime_format"]
+        self.tz = None
+        self.table = None
+        self.valid = True
+        if tz_config.get("scale", "utc") != "utc":
+            # A uniform scale renders like a fixed zone whose offset only moves at leap seconds
+            self.tz = self.time_scale(tz_config)
+            if self.tz is None:
+                self.valid = False
+            else:
+                self.table = self.tz.table
+        elif tz_config["timezone"] != "local":
+            try:
+                self.tz = pytz.timezone(tz_config["timezone"])
+                self.table = OffsetTable(self.tz)
+            except pytz.UnknownTimeZoneError:
+                self.valid = False
+        self.names = locale_names(tz_config["locale"]) if tz_config.get("locale") else None
+        self.pattern, self.fields = bind_extensions(self.format, tz_config) if self.valid else (self.format, [])
+        # The whole-second text is cached per second; sub-second frames only splice in digits
+        self.pattern, self.subsecond = mark_subsecond(self.pattern) if self.valid else (self.format, [])
+        self.resolution = format_resolution(self.format if self.valid else FALLBACK_FORMAT)
+        for field in self.fields:
+            self.resolution = min(self.resolution, field.resolution)
+        # Formats made only of fields (e.g. "%{epoch}") skip strftime altogether; a sub-second
+        # marker still needs its digits spliced in, so those take the per-second cache instead
+        self.static = self.valid and not self.subsecond and "%" not in self.pattern
+        self.static_parts = self.pattern.split(EXTENSION_MARK)
+        # Text that changes within a second needs frame-rate ticks (see frame_boundary)
+        self.animated = bool(self.subsecond) or any(getattr(field, "animated", False) for field in self.fields)
+        # Lines that only change per minute or slower (usually the date) are cached per UTC minute
+        self.resolutions = [format_resolution(line) for line in self.pattern.split("\n")]
+        self.segmented = len(self.resolutions) > 1 and any(resolution >= 60 for resolution in self.resolutions)
+        # Bound formats per (offset, abbreviation): revisiting a period (scrubbing across DST) is a lookup
+        self.period_formats = {}
+        self.invalidate()
+
+    @staticmethod
+    def time_scale(tz_config):
+        """The configured time scale object, or None for civil time or an unknown scale"""
+        name = tz_config.get("scale", "utc")
+        if name == "utc":
+            return None
+        if name not in TIME_SCALES:
+            load_extensions()
+        factory = TIME_SCALES.get(name)
+        return factory() if factory else None
+
+    def invalidate(self):
+        """Drop cached per-period segments, e.g. after a wall-clock step or resume"""
+        self.cached_minute = None
+        self.cached_lines = None
+        self.cached_second = None
+        self.cached_parts = None
+        self.period_start = math.inf
+        self.period_end = -math.inf
+        self.boundary_from = math.inf
+        self.boundary = -math.inf
+        self.text_from = math.inf
+        self.text_until = -math.inf
+        self.named_formats = {}
+        for field in self.fields:
+            if hasattr(field, "invalidate"):
+                field.invalidate()
+
+    def enter_period(self, now):
+        self.period_start, self.period_end, self.offset, abbreviation = self.table.period(now)
+        bound = self.period_formats.get((self.offset, abbreviation))
+        if bound is None:
+            fmt = bind_zone_directives(self.pattern, self.offset, abbreviation)
+            bound = self.period_formats[self.offset, abbreviation] = (fmt, fmt.split("\n"))
+        self.period_format, self.period_lines = bound
+        self.cached_minute = None
+
+    def utcoffset(self, now):
+        if self.tz is None:
+            return time.localtime(now).tm_gmtoff
+        return self.table.utcoffset(now)
+
+    def render(self, now):
+        # At frame rate only animated zones change per frame; the rest keep their text until
+        # their own next boundary, so a frame costs them a comparison
+        if self.animated:
+            return self.compose(now)
+        if not self.text_from <= now < self.text_until:
+            self.text = self.compose(now)
+            self.text_from = now
+            self.text_until = self.next_boundary(now)
+        return self.text
+
+    def compose(self, now):
+        if self.static:
+            if self.pattern == EXTENSION_MARK:
+                return self.fields[0].render(now)
+            return splice_parts(self.static_parts, self.fields, now)
+        if self.subsecond:
+            second = math.floor(now)
+            if second != self.cached_second:
+                self.cached_parts = self.render_text(second).split(SUBSECOND_MARK)
+                self.cached_second = second
+            text = splice_fraction(self.cached_parts, self.subsecond, now - second)
+        else:
+            text = self.render_text(now)
+        if self.fields:
+            return splice_fields(text, self.fields, now)
+        return text
+
+    def render_text(self, now):
+        if self.static:
+            return self.pattern
+        if not self.valid:
+            return time.strftime(FALLBACK_FORMAT, time.localtime(now))
+        try:
+            if self.tz is None:
+                moment = time.localtime(now)
+                fmt = self.pattern
+                lines = None
+            else:
+                # Wall time is UTC plus the period's offset; no tzinfo arithmetic per tick
+                if not self.period_start <= now < self.period_end:
+                    self.enter_period(now)
+                moment = time.gmtime(now + self.offset)
+                fmt = self.period_format
+                lines = self.period_lines
+            if self.names:
+                fmt, lines = self.bind_names(fmt, moment)
+            if not self.segmented:
+                return time.strftime(fmt, moment)
+            lines = lines or fmt.split("\n")
+            minute = int(now // 60)
+            if minute != self.cached_minute:
+                self.cached_lines = [
+                    time.strftime(line, moment) if resolution >= 60 else None
+                    for line, resolution in zip(lines, self.resolutions)
+                ]
+                self.cached_minute = minute
+            return "\n".join(
+                cached if cached is not None else time.strftime(line, moment)
+                for cached, line in zip(self.cached_lines, lines)
+            )
+        except ValueError:
+            try:
+                return time.strftime(FALLBACK_FORMAT, time.localtime(now))
+            except ValueError:
+                return "Error"
+
+    def bind_names(self, fmt, moment):
+        # At most one bound format per period format and weekday/month/half-day: a dict lookup per tick
+        key = (fmt, moment.tm_wday, moment.tm_mon, moment.tm_hour >= 12)
+        bound = self.named_formats.get(key)
+        if bound is None:
+            named = bind_name_directives(fmt, self.names, *key[1:])
+            bound = self.named_formats[key] = (named, named.split("\n"))
+        return bound
+
+    def sample_render(self, piece, moment):
+        """Render one directive for a datetime the way this zone would (used for layout sizing)"""
+        if self.names:
+            piece = bind_name_directives(piece, self.names, moment.weekday(), moment.month, moment.hour >= 12)
+        return moment.strftime(piece)
+
+    def layout_samples(self, now):
+        """Texts %z, %Z and each %{field} can show from `now` on, keyed by directive (used for layout sizing)"""
+        periods = set()
+        if self.table is not None:
+            moment = now
+            # Future transitions only: pytz tables run a few decades ahead, leap tables a few entries
+            while moment < math.inf and len(periods) < LAYOUT_PERIODS:
+                _, moment, offset, name = self.table.period(moment)
+                periods.add((offset, name))
+        else:
+            for month in range(13):
+                local = time.localtime(now + month * 30 * 86400)
+                periods.add((local.tm_gmtoff, local.tm_zone))
+        samples = {
+            "%z": [format_offset_compact(offset) for offset, _ in periods],
+            "%Z": [name for _, name in periods]
+        }
+        names = [match.group(1) for match in EXTENSION_RE.finditer(self.format) if match.group(1) in EXTENSIONS]
+        for name, field in zip(names, self.fields):
+            samples["%{" + name + "}"] = list(field.samples(now)) if hasattr(field, "samples") else [field.render(now)]
+        return samples
+
+    def next_boundary(self, now):
+        """First instant after `now` at which this zone's rendered text can change"""
+        if self.boundary_from <= now < self.boundary:
+            return self.boundary
+        self.boundary_from = now
+        self.boundary = self.find_boundary(now)
+        for field in self.fields:
+            if hasattr(field, "next_change"):
+                self.boundary = min(self.boundary, field.next_change(now))
+        return self.boundary
+
+    def find_boundary(self, now):
+        if self.resolution <= 60:
+            return (math.floor(now / self.resolution) + 1) * self.resolution
+        # Hour/day boundaries are local, so shift by the zone's current offset
+        offset = self.utcoffset(now)
+        boundary = math.floor(now) + self.resolution - ((math.floor(now) + offset) % self.resolution)
+        if self.utcoffset(boundary) == offset:
+            return boundary
+        # An offset change (DST) lands before the boundary and changes the text itself; find it
+        low, high = math.floor(now), boundary
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self.utcoffset(middle) == offset:
+                low = middle
+            else:
+                high = middle
+        return high
+
+
+class ClockHealth:
+    """Spots suspend gaps and wall-clock steps by comparing uptime and wall time between checks.
+
+    A suspend moves both clocks on together; a step (NTP, a manual change) moves only wall time.
+    """
+
+    STEP = "step"
+    SUSPEND = "suspend"
+
+    def __init__(self, clock=SYSTEM_CLOCK, step_tolerance=1.0, gap_tolerance=2.0):
+        self.uptime = getattr(clock, "uptime", clock.monotonic)
+        self.wall = clock.time
+        self.step_tolerance = step_tolerance
+        self.gap_tolerance = gap_tolerance
+        self.steps = 0
+        self.suspends = 0
+        self.last_jump = 0.0
+        self.reset()
+
+    def reset(self):
+        """Take a fresh baseline, e.g. after the tick was stopped on purpose"""
+        self.last_uptime, self.last_wall = self.uptime(), self.wall()
+
+    def check(self, expected_interval):
+        """Return STEP, SUSPEND or None for the time elapsed since the previous check"""
+        uptime, wall = self.uptime(), self.wall()
+        elapsed = uptime - self.last_uptime
+        drift = (wall - self.last_wall) - elapsed
+        event = None
+        if abs(drift) > self.step_tolerance:
+            event = self.STEP
+            self.steps += 1
+            self.last_jump = drift
+        elif elapsed > expected_interval + self.gap_tolerance:
+            event = self.SUSPEND
+            self.suspends += 1
+            self.last_jump = elapsed - expected_interval
+        self.last_uptime, self.last_wall = uptime, wall
+        return event
+
+
+def format_offset(seconds):
+    sign = "+" if seconds >= 0 else "-"
+    minutes = abs(seconds) // 60
+    return f"{sign}{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class ClockRenderer:
+    """Renders every configured zone from a single time read"""
+
+    def __init__(self, config, clock=SYSTEM_CLOCK):
+        self.clock = clock
+        self.zones = [ZoneRenderer(tz_config) for tz_config in config["timezones"]]
+        self.subsecond = any(zone.animated for zone in self.zones)
+
+    def render_all(self, now=None):
+        if now is None:
+            now = self.clock.time()
+        return [(zone.name, zone.render(now)) for zone in self.zones]
+
+    def next_boundary(self, now, fps=None):
+        boundary = min(zone.next_boundary(now) for zone in self.zones)
+        if fps and self.subsecond:
+            boundary = min(boundary, frame_boundary(now, fps))
+        return boundary
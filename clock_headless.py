@@ -0,0 +1,81 @@
+import argparse
+import json
+import sys
+
+from clock_engine import SYSTEM_CLOCK, ClockRenderer, load_config_file
+
+# i3bar only understands #RRGGBB, so map the names offered in the settings dialog
+I3_COLORS = {
+    "white": "#FFFFFF",
+    "red": "#FF0000",
+    "green": "#00FF00",
+    "blue": "#0000FF",
+    "yellow": "#FFFF00",
+    "cyan": "#00FFFF",
+    "magenta": "#FF00FF"
+}
+
+
+def render_plain(renderer, now, separator):
+    return separator.join(" ".join(text.split()) for name, text in renderer.render_all(now))
+
+
+def render_i3bar(renderer, now):
+    blocks = []
+    for zone, (name, text) in zip(renderer.zones, renderer.render_all(now)):
+        block = {"name": "clock", "instance": name, "full_text": " ".join(text.split())}
+        color = I3_COLORS.get(str(zone.config.get("color", "")).lower())
+        if color is None and str(zone.config.get("color", "")).startswith("#"):
+            color = zone.config["color"]
+        if color:
+            block["color"] = color
+        blocks.append(block)
+    return json.dumps(blocks, ensure_ascii=False, separators=(",", ":"))
+
+
+def run(config_path, mode="plain", separator=" | ", once=False, out=sys.stdout, clock=SYSTEM_CLOCK):
+    config = load_config_file(config_path)
+    renderer = ClockRenderer(config, clock)
+    if mode == "i3bar":
+        out.write('{"version":1}\n[\n')
+    last = None
+    while True:
+        now = clock.time()
+        if mode == "i3bar":
+            line = render_i3bar(renderer, now) + ","
+        else:
+            line = render_plain(renderer, now, separator)
+        # Only write when the visible text changed; status bars redraw on every line
+        if line != last:
+            out.write(line + "\n")
+            out.flush()
+            last = line
+        if once:
+            return
+        boundary = renderer.next_boundary(now, config["subsecond_fps"])
+        # Sleep can return early (signals), so keep sleeping until the boundary is reached
+        while True:
+            remaining = boundary - clock.time()
+            if remaining <= 0:
+                break
+            clock.sleep(remaining)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print the configured clocks for status bars (tmux, polybar, i3bar)")
+    parser.add_argument("--config", default="clock_config.json", help="path to clock_config.json")
+    parser.add_argument("--mode", choices=["plain", "i3bar"], default="plain",
+                        help="plain: one line per update; i3bar: i3bar JSON protocol")
+    parser.add_argument("--separator", default=" | ", help="text placed between zones in plain mode")
+    parser.add_argument("--once", action="store_true", help="print once and exit (for tmux #() status commands)")
+    args = parser.parse_args(argv)
+    try:
+        run(args.config, args.mode, args.separator, args.once)
+    except (KeyboardInterrupt, BrokenPipeError):
+        # The bar went away; exit quietly without a traceback on stderr
+        sys.stderr.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+import re
+import functools
+from datetime import datetime
+from tkinter import font as tkfont
+
+# tk.Label pads its text by borderwidth + highlightthickness + padx/pady on each side;
+# the overlay grid adds pady=2 above and below each label
+ROW_PADDING = 4
+
+
+class TextMetrics:
+    """Overlay text sizes from tkinter.font, cached so positioning needs no Tk layout pass"""
+
+    def __init__(self, root, maxsize=512):
+        self.root = root
+        self.fonts = {}
+        # (family, size, weight) -> table mapping every digit to that font's widest one
+        self.digit_tables = {}
+        self._measure_shape = functools.lru_cache(maxsize=maxsize)(self._measure_text)
+
+    def font(self, family, size, weight="bold"):
+        key = (family, size, weight)
+        if key not in self.fonts:
+            self.fonts[key] = tkfont.Font(root=self.root, family=family, size=size, weight=weight)
+        return self.fonts[key]
+
+    def measure_text(self, family, size, weight, text):
+        # Keyed on the shape of the text: with every digit the widest one, a ticking clock measures
+        # one string per format rather than one per second, and its width never shrinks
+        key = (family, size, weight)
+        if key not in self.digit_tables:
+            self.digit_tables[key] = str.maketrans("0123456789", widest_digit(self.font(*key)) * 10)
+        return self._measure_shape(family, size, weight, text.translate(self.digit_tables[key]))
+
+    def _measure_text(self, family, size, weight, text):
+        measured = self.font(family, size, weight)
+        lines = text.split("\n")
+        return max(measured.measure(line) for line in lines), measured.metrics("linespace") * len(lines)
+
+    def clear(self):
+        self._measure_shape.cache_clear()
+        self.fonts = {}
+        self.digit_tables = {}
+
+
+def label_padding(label):
+    inset = int(label.cget("borderwidth")) + int(label.cget("highlightthickness"))
+    return 2 * (inset + int(label.cget("padx"))), 2 * (inset + int(label.cget("pady")))
+
+
+def stack_size(metrics, rows, padding):
+    """Size of a column of labels; rows are (family, size, weight, text)"""
+    pad_x, pad_y = padding
+    width = height = 0
+    for family, size, weight, text in rows:
+        text_width, text_height = metrics.measure_text(family, size, weight, text)
+        width = max(width, text_width + pad_x)
+        height += text_height + pad_y + ROW_PADDING
+    return width, height
+
+
+def widest_digit(measured):
+    return max("0123456789", key=measured.measure)
+
+
+# Directives that always print this many digits; the widest digit stands in for each one
+NUMERIC_WIDTHS = {
+    "d": 2, "H": 2, "I": 2, "j": 3, "m": 2, "M": 2, "S": 2, "U": 2, "W": 2,
+    "V": 2, "y": 2, "Y": 4, "G": 4, "f": 6, "L": 3, "u": 1, "w": 1, "C": 2
+}
+EXPANSIONS = {"T": "%H:%M:%S", "R": "%H:%M", "D": "%m/%d/%y", "F": "%Y-%m-%d"}
+# Every month, every weekday and both halves of the day, for names like %a %B %p %c
+SAMPLES = [datetime(2024, month, 1 + day, hour) for month in range(1, 13) for day in range(7) for hour in (0, 12)]
+# Extension fields (%{name}) are one piece, so their samples can stand in for them; flags
+# (%-d, %#d, %^a, ...) stay with their directive
+DIRECTIVE_SPLIT = re.compile(r"(%\{\w+\}|%[-#_0^EO]*.)")
+
+
+def reserved_line_width(measured, line, render, samples):
+    # Build the widest possible line piece by piece, then measure it whole so kerning counts
+    digit = widest_digit(measured)
+    any_digit = str.maketrans("0123456789", digit * 10)
+    line = line.replace("%%", "\0")
+    for code, expansion in EXPANSIONS.items():
+        line = line.replace("%" + code, expansion)
+    widest = []
+    for piece in DIRECTIVE_SPLIT.split(line):
+        directive = piece if piece[:2] == "%{" else "%" + piece[-1:]
+        if piece[:1] == "%" and directive in samples:
+            # Zone names/offsets and extension fields: the widest text they can show
+            widest.append(max((text.translate(any_digit) for text in samples[directive]), key=measured.measure))
+        elif len(piece) >= 2 and piece[0] == "%" and piece[1] != "{":
+            code = piece[-1]
+            if code in NUMERIC_WIDTHS:
+                widest.append(digit * NUMERIC_WIDTHS[code])
+            else:
+                widest.append(max((render(piece, sample) for sample in SAMPLES), key=measured.measure))
+        else:
+            widest.append(piece.replace("\0", "%"))
+    return measured.measure("".join(widest))
+
+
+def reserved_text_size(metrics, family, size, weight, fmt, render=None, samples=None):
+    """Largest (width, height) any rendering of `fmt` can reach in this font.
+
+    `samples` maps directives the sample dates can't render (%z, %Z, %{field}) to the texts they
+    can show, as from ZoneRenderer.layout_samples.
+    """
+    render = render or (lambda piece, moment: moment.strftime(piece))
+    measured = metrics.font(family, size, weight)
+    lines = fmt.split("\n")
+    width = max(reserved_line_width(measured, line, render, samples or {}) for line in lines)
+    return width, measured.metrics("linespace") * len(lines)
@@ -0,0 +1,44 @@
+import threading
+from collections import deque
+
+
+class Metrics:
+    """Thread-safe rolling timing samples, reported in milliseconds"""
+
+    def __init__(self, window=200):
+        self.window = window
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.counts = {}
+
+    def record(self, name, seconds):
+        with self.lock:
+            if name not in self.samples:
+                self.samples[name] = deque(maxlen=self.window)
+                self.counts[name] = 0
+            self.samples[name].append(seconds)
+            self.counts[name] += 1
+
+    def summary(self):
+        with self.lock:
+            items = [(name, list(values), self.counts[name]) for name, values in self.samples.items()]
+        result = {}
+        for name, values, count in items:
+            ordered = sorted(values)
+            result[name] = {
+                "count": count,
+                "last_ms": values[-1] * 1000,
+                "avg_ms": sum(values) / len(values) * 1000,
+                "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+                "max_ms": ordered[-1] * 1000
+            }
+        return result
+
+    def report(self):
+        lines = []
+        for name, stats in sorted(self.summary().items()):
+            lines.append(
+                f"{name}: n={stats['count']} last={stats['last_ms']:.2f}ms "
+                f"avg={stats['avg_ms']:.2f}ms p95={stats['p95_ms']:.2f}ms max={stats['max_ms']:.2f}ms"
+            )
+        return "\n".join(lines) if lines else "No samples yet"
@@ -0,0 +1,243 @@
+import argparse
+import collections
+import math
+import socket
+import struct
+import sys
+import threading
+
+from clock_engine import SYSTEM_CLOCK
+
+# SNTP (RFC 4330) packet: flags, stratum, poll, precision, root delay, root dispersion,
+# reference id, then reference/originate/receive/transmit timestamps as 32.32 fixed point
+PACKET = struct.Struct("!BBbbIII8I")
+NTP_EPOCH_DELTA = 2208988800
+CLIENT_FLAGS = (4 << 3) | 3
+SERVER_FLAGS = (4 << 3) | 4
+NTP_PORT = 123
+
+# Keep the lowest-delay sample of the last few, as ntpd's clock filter does:
+# the shortest round trip has the least room for asymmetric queueing
+FILTER_SIZE = 8
+# First queries go out quickly to fill the filter, then the interval adapts
+BURST_COUNT = 4
+BURST_INTERVAL = 2
+# Offsets that move less than this between polls count as stable and let the interval grow
+STABLE_OFFSET = 0.005
+
+Estimate = collections.namedtuple("Estimate", "offset delay jitter stratum checked")
+
+
+def to_ntp(seconds):
+    seconds += NTP_EPOCH_DELTA
+    whole = int(seconds)
+    return whole, int((seconds - whole) * 4294967296) & 0xFFFFFFFF
+
+
+def from_ntp(whole, fraction):
+    return whole - NTP_EPOCH_DELTA + fraction / 4294967296
+
+
+def request_packet(transmit):
+    return PACKET.pack(CLIENT_FLAGS, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, *to_ntp(transmit))
+
+
+def query(server, port=NTP_PORT, timeout=2.0, clock=SYSTEM_CLOCK):
+    """One SNTP exchange; returns (offset, round-trip delay, stratum) in seconds"""
+    address = socket.getaddrinfo(server, port, 0, socket.SOCK_DGRAM)[0]
+    with socket.socket(address[0], socket.SOCK_DGRAM) as sock:
+        sock.settimeout(timeout)
+        originate = clock.time()
+        packet = request_packet(originate)
+        sock.sendto(packet, address[4])
+        while True:
+            data, _ = sock.recvfrom(512)
+            received = clock.time()
+            if len(data) < PACKET.size:
+                continue
+            fields = PACKET.unpack_from(data)
+            # Only accept the reply to this request (the originate field echoes our transmit stamp)
+            if fields[9:11] == PACKET.unpack(packet)[13:15] and fields[0] & 7 == 4:
+                break
+    stratum = fields[1]
+    if stratum == 0:
+        raise OSError(f"{server} sent a kiss-o'-death ({fields[6].to_bytes(4, 'big').decode('ascii', 'replace')})")
+    server_received = from_ntp(*fields[11:13])
+    server_sent = from_ntp(*fields[13:15])
+    offset = ((server_received - originate) + (server_sent - received)) / 2
+    delay = (received - originate) - (server_sent - server_received)
+    return offset, delay, stratum
+
+
+class OffsetFilter:
+    """Recent (delay, offset) samples; the estimate is the offset of the lowest-delay one"""
+
+    def __init__(self, size=FILTER_SIZE):
+        self.samples = collections.deque(maxlen=size)
+
+    def add(self, offset, delay):
+        self.samples.append((delay, offset))
+
+    def best(self):
+        """Return (offset, delay, jitter) or None before the first sample"""
+        if not self.samples:
+            return None
+        delay, offset = min(self.samples)
+        jitter = math.sqrt(sum((other - offset) ** 2 for _, other in self.samples) / len(self.samples))
+        return offset, delay, jitter
+
+
+class NtpMonitor:
+    """Polls an NTP server on a background thread; `estimate` is the latest filtered result"""
+
+    def __init__(self, settings, clock=SYSTEM_CLOCK, on_update=None):
+        self.server = settings["server"]
+        self.port = settings.get("port", NTP_PORT)
+        self.min_interval = settings.get("min_interval", 64)
+        self.max_interval = max(self.min_interval, settings.get("max_interval", 1024))
+        self.timeout = settings.get("timeout", 2.0)
+        self.clock = clock
+        self.on_update = on_update
+        self.filter = OffsetFilter()
+        self.estimate = None
+        self.error = None
+        self.interval = self.min_interval
+        self.polls = 0
+        self.stopping = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopping.set()
+
+    def poll(self):
+        """Query once, update the estimate and return the seconds to wait before the next poll"""
+        self.polls += 1
+        previous = self.estimate
+        try:
+            offset, delay, stratum = query(self.server, self.port, self.timeout, self.clock)
+        except (OSError, ValueError) as e:
+            self.error = str(e) or e.__class__.__name__
+            # Back off while the server is unreachable, but never past the normal ceiling
+            self.interval = min(self.max_interval, self.interval * 2) if previous else self.min_interval
+            return BURST_INTERVAL if self.polls < BURST_COUNT else self.interval
+        self.error = None
+        self.filter.add(offset, delay)
+        best_offset, best_delay, jitter = self.filter.best()
+        self.estimate = Estimate(best_offset, best_delay, jitter, stratum, self.clock.time())
+        if self.polls < BURST_COUNT:
+            return BURST_INTERVAL
+        if previous and abs(best_offset - previous.offset) < max(STABLE_OFFSET, 2 * jitter):
+            self.interval = min(self.max_interval, self.interval * 2)
+        else:
+            self.interval = self.min_interval
+        return self.interval
+
+    def run(self):
+        while not self.stopping.is_set():
+            wait = self.poll()
+            if self.on_update:
+                self.on_update(self.estimate, self.error)
+            self.stopping.wait(wait)
+
+
+def format_estimate(estimate, error, server):
+    if estimate is None:
+        return f"NTP: no reply from {server} ({error})" if error else f"NTP: querying {server}"
+    sign = "+" if estimate.offset >= 0 else "-"
+    text = f"Clock {sign}{abs(estimate.offset) * 1000:.1f} ms vs {server} (±{estimate.delay * 500:.1f} ms)"
+    return text + " (stale)" if error else text
+
+
+class NtpResponder:
+    """Minimal NTP server for testing: answers every request with its clock plus `skew` seconds"""
+
+    def __init__(self, host="127.0.0.1", port=0, skew=0.0, clock=SYSTEM_CLOCK):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.skew = skew
+        self.clock = clock
+        self.thread = None
+
+    @property
+    def address(self):
+        return self.sock.getsockname()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+        return self
+
+    def serve(self):
+        while True:
+            try:
+                data, peer = self.sock.recvfrom(512)
+            except OSError:
+                return
+            if len(data) < PACKET.size:
+                continue
+            received = self.clock.time() + self.skew
+            fields = PACKET.unpack_from(data)
+            reply = PACKET.pack(
+                SERVER_FLAGS, 1, fields[2], -20, 0, 0, int.from_bytes(b"LOCL", "big"),
+                *to_ntp(received), fields[13], fields[14], *to_ntp(received),
+                *to_ntp(self.clock.time() + self.skew)
+            )
+            self.sock.sendto(reply, peer)
+
+    def close(self):
+        self.sock.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query an NTP server, or run a local stand-in responder")
+    parser.add_argument("--server", default="pool.ntp.org", help="NTP server to query")
+    parser.add_argument("--port", type=int, default=NTP_PORT)
+    parser.add_argument("--count", type=int, default=BURST_COUNT, help="queries to filter")
+    parser.add_argument("--serve", action="store_true", help="run a responder on --port instead of querying")
+    parser.add_argument("--skew", type=float, default=0.0, help="seconds the responder adds to its clock")
+    parser.add_argument("--self-test", action="store_true",
+                        help="query a local responder running with --skew and compare")
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        responder = NtpResponder("127.0.0.1", args.port, args.skew)
+        print(f"Answering NTP on {responder.address} with a {args.skew:+.3f}s skew")
+        try:
+            responder.serve()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            responder.close()
+        return 0
+
+    responder = None
+    server, port = args.server, args.port
+    if args.self_test:
+        responder = NtpResponder(skew=args.skew).start()
+        server, port = responder.address
+    samples = OffsetFilter()
+    try:
+        for _ in range(args.count):
+            offset, delay, stratum = query(server, port)
+            samples.add(offset, delay)
+            print(f"offset {offset * 1000:+.3f} ms  delay {delay * 1000:.3f} ms  stratum {stratum}")
+    except OSError as e:
+        print(f"No reply from {server}: {e}")
+        return 1
+    finally:
+        if responder:
+            responder.close()
+    offset, delay, jitter = samples.best()
+    print(f"estimate {offset * 1000:+.3f} ms (delay {delay * 1000:.3f} ms, jitter {jitter * 1000:.3f} ms)")
+    if args.self_test:
+        return 0 if abs(offset - args.skew) < max(delay, 0.001) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
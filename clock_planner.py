@@ -0,0 +1,239 @@
+import argparse
+import calendar
+import sys
+import time
+from datetime import date, timedelta
+
+import pytz
+
+from clock_engine import DEFAULT_ZONE, OffsetTable, load_config_file
+from clock_sun import daylight_bits
+
+# Every minute of the range is one bit of a Python int, so AND/OR/shift over the whole
+# range run in C a machine word at a time: the grid is processed 64 minutes per operation
+DAY_MINUTES = 1440
+SHADES = " .:-=+*#%@"
+
+
+def parse_minutes(text):
+    hour, minute = text.split(":")[:2]
+    return int(hour) * 60 + int(minute)
+
+
+def runs_at_least(bits, length):
+    """Bits i for which bits i .. i+length-1 are all set"""
+    have = 1
+    while have < length:
+        step = min(have, length - have)
+        bits &= bits >> step
+        have += step
+    return bits
+
+
+def iter_runs(bits):
+    """Yield (start, end) bit ranges of consecutive set bits, lowest first"""
+    while bits:
+        start = (bits & -bits).bit_length() - 1
+        filled = bits + (1 << start)
+        end = (filled & -filled).bit_length() - 1
+        yield start, end
+        bits &= -(1 << end)
+
+
+def at_least(planes, count):
+    """Bit-sliced comparison: bits where the per-minute counter held in `planes` is >= count"""
+    if count <= 0:
+        return -1
+    if count >= 1 << len(planes):
+        return 0
+    greater, equal = 0, -1
+    for bit in reversed(range(len(planes))):
+        plane = planes[bit]
+        if count >> bit & 1:
+            equal &= plane
+        else:
+            greater |= equal & plane
+            equal &= ~plane
+    return greater | equal
+
+
+class ZoneHours:
+    """One zone's working hours, turned into UTC minute ranges"""
+
+    def __init__(self, tz_config):
+        tz_config = dict(DEFAULT_ZONE, **tz_config)
+        self.name = tz_config["name"]
+        self.timezone = tz_config["timezone"]
+        self.table = None if self.timezone == "local" else OffsetTable(pytz.timezone(self.timezone))
+        self.start = parse_minutes(tz_config["work_start"])
+        self.end = parse_minutes(tz_config["work_end"])
+        if self.end <= self.start:
+            self.end += DAY_MINUTES
+        self.days = set(tz_config["work_days"])
+        self.latitude = tz_config["latitude"]
+        self.longitude = tz_config["longitude"]
+
+    def to_utc(self, local):
+        # The local wall time as if it were UTC, shifted by the offset in force at that instant
+        if self.table is None:
+            return time.mktime(time.gmtime(local)[:8] + (-1,))
+        guess = local - self.table.utcoffset(local)
+        return local - self.table.utcoffset(guess)
+
+    def intervals(self, first_day, days):
+        """UTC (start, end) seconds of every working block on local dates first_day .. +days"""
+        for offset in range(days):
+            day = first_day + timedelta(days=offset)
+            if day.weekday() not in self.days:
+                continue
+            midnight = calendar.timegm(day.timetuple())
+            yield self.to_utc(midnight + self.start * 60), self.to_utc(midnight + self.end * 60)
+
+
+class MeetingPlanner:
+    """Working-hour overlap of several zones on a minute grid starting at `start` (UTC seconds)"""
+
+    def __init__(self, zones, start, days):
+        self.zones = [ZoneHours(tz_config) for tz_config in zones]
+        self.start = int(start) // 60 * 60
+        self.minutes = days * DAY_MINUTES
+        self.full = (1 << self.minutes) - 1
+        first_day = date(*time.gmtime(self.start)[:3]) - timedelta(days=1)
+        self.masks = [self.zone_mask(zone, first_day, days + 2) for zone in self.zones]
+        self.planes = self.count_planes()
+        self.daylight_mask = None
+
+    def zone_mask(self, zone, first_day, days):
+        mask = 0
+        for start, end in zone.intervals(first_day, days):
+            low = max(0, int(start - self.start) // 60)
+            high = min(self.minutes, int(end - self.start) // 60)
+            if high > low:
+                mask |= ((1 << (high - low)) - 1) << low
+        return mask
+
+    def count_planes(self):
+        # Per-minute count of zones at work, as binary digits: planes[k] holds bit k of every counter
+        planes = []
+        for mask in self.masks:
+            carry = mask
+            for index, plane in enumerate(planes):
+                planes[index], carry = plane ^ carry, plane & carry
+                if not carry:
+                    break
+            if carry:
+                planes.append(carry)
+        return planes
+
+    def daylight(self):
+        """Bitset of minutes when the sun is up in every zone that has coordinates"""
+        if self.daylight_mask is None:
+            mask = self.full
+            for zone in self.zones:
+                if zone.latitude is not None and zone.longitude is not None:
+                    mask &= daylight_bits(zone.latitude, zone.longitude, self.start, self.minutes)
+            self.daylight_mask = mask
+        return self.daylight_mask
+
+    def available(self, min_zones=None, daylight=False):
+        """Bitset of minutes when at least `min_zones` (default: all) zones are working"""
+        if min_zones is None or min_zones >= len(self.zones):
+            mask = self.full
+            for zone_mask in self.masks:
+                mask &= zone_mask
+        else:
+            mask = at_least(self.planes, min_zones) & self.full
+        return mask & self.daylight() if daylight else mask
+
+    def windows(self, min_zones=None, min_minutes=30, daylight=False):
+        """[(start, end)] UTC seconds of every slot of at least `min_minutes` that suits `min_zones`"""
+        mask = self.available(min_zones, daylight)
+        return [
+            (self.start + low * 60, self.start + high * 60)
+            for low, high in iter_runs(mask) if high - low >= min_minutes
+        ]
+
+    def heat(self, cell_minutes=60):
+        """Rows of per-cell counts, one row per 24 hours from `start`: zones working for the whole cell"""
+        cells = DAY_MINUTES // cell_minutes
+        rows = self.minutes // DAY_MINUTES
+        size = (self.minutes + 7) // 8
+        starts = [row * DAY_MINUTES + cell * cell_minutes for row in range(rows) for cell in range(cells)]
+        counts = [0] * len(starts)
+        for mask in self.masks:
+            # One bytes conversion per zone, then cell starts are plain byte lookups
+            whole = runs_at_least(mask, cell_minutes).to_bytes(size, "little")
+            for index, minute in enumerate(starts):
+                if whole[minute >> 3] >> (minute & 7) & 1:
+                    counts[index] += 1
+        return [counts[row * cells:(row + 1) * cells] for row in range(rows)]
+
+
+def render_heat(planner, cell_minutes=60):
+    lines = []
+    zones = max(1, len(planner.zones))
+    cells = DAY_MINUTES // cell_minutes
+    heat = planner.heat(cell_minutes)
+    days = [time.strftime("%a %m-%d ", time.gmtime(planner.start + row * 86400)) for row in range(len(heat))]
+    # The hour ruler starts where the cells do, whatever width the day labels come out at
+    width = max(map(len, days), default=len("UTC "))
+    lines.append("UTC".ljust(width) + "".join(str(cell * cell_minutes // 60 % 10) if cell * cell_minutes % 60 == 0
+                                              else " " for cell in range(cells)))
+    for day, counts in zip(days, heat):
+        lines.append(day.ljust(width) + "".join(SHADES[count * (len(SHADES) - 1) // zones] for count in counts))
+    return "\n".join(lines)
+
+
+def benchmark(days=90, zone_count=20):
+    zone_names = [
+        "US/Pacific", "US/Mountain", "US/Central", "US/Eastern", "America/Sao_Paulo", "Europe/London",
+        "Europe/Berlin", "Europe/Helsinki", "Africa/Nairobi", "Asia/Dubai", "Asia/Kolkata", "Asia/Kathmandu",
+        "Asia/Singapore", "Asia/Shanghai", "Asia/Tokyo", "Australia/Adelaide", "Australia/Sydney",
+        "Pacific/Auckland", "America/St_Johns", "Asia/Tehran"
+    ]
+    zones = [{"name": name, "timezone": name, "work_start": "07:00", "work_end": "19:00"}
+             for name in (zone_names * (zone_count // len(zone_names) + 1))[:zone_count]]
+    start = calendar.timegm(date(2026, 2, 1).timetuple())
+    started = time.perf_counter()
+    planner = MeetingPlanner(zones, start, days)
+    built = time.perf_counter() - started
+    started = time.perf_counter()
+    slots = planner.windows(min_zones=zone_count // 2, min_minutes=30)
+    everyone = planner.windows()
+    heat = planner.heat(30)
+    queried = time.perf_counter() - started
+    print(f"{zone_count} zones x {days} days ({planner.minutes} minutes): built in {built * 1000:.0f} ms, "
+          f"windows + heat map in {queried * 1000:.0f} ms")
+    print(f"{len(everyone)} all-zone windows, {len(slots)} windows with {zone_count // 2}+ zones, "
+          f"{len(heat)}x{len(heat[0])} heat cells")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find meeting slots inside every configured zone's working hours")
+    parser.add_argument("--config", default="clock_config.json", help="path to clock_config.json")
+    parser.add_argument("--start", help="first UTC date, YYYY-MM-DD (default today)")
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--min-zones", type=int, help="zones that must be at work (default all)")
+    parser.add_argument("--min-minutes", type=int, default=30, help="shortest slot to list")
+    parser.add_argument("--daylight", action="store_true",
+                        help="only slots in daylight for every zone with latitude/longitude")
+    parser.add_argument("--cell", type=int, default=60, choices=[15, 30, 60], help="heat map cell in minutes")
+    parser.add_argument("--bench", action="store_true", help="time 20 zones over 90 days and exit")
+    args = parser.parse_args(argv)
+    if args.bench:
+        benchmark()
+        return 0
+
+    config = load_config_file(args.config)
+    first = date.fromisoformat(args.start) if args.start else date(*time.gmtime()[:3])
+    planner = MeetingPlanner(config["timezones"], calendar.timegm(first.timetuple()), args.days)
+    print(render_heat(planner, args.cell))
+    print()
+    for start, end in planner.windows(args.min_zones, args.min_minutes, args.daylight):
+        print(f"{time.strftime('%a %Y-%m-%d %H:%M', time.gmtime(start))} - "
+              f"{time.strftime('%H:%M', time.gmtime(end))} UTC ({(end - start) // 60} min)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+import argparse
+import math
+import sys
+import time
+
+import pytz
+
+from clock_dst import local_transitions
+from clock_engine import (
+    DAY, DEFAULT_ZONE, OffsetTable, ZoneRenderer, format_offset, load_config_file, register_extension
+)
+
+# The system zone has no transition table, so its next change is probed this far ahead
+LOCAL_WINDOW = 7 * DAY
+DAY_NAMES = {-1: "yesterday", 0: "today", 1: "tomorrow"}
+
+
+class LocalPeriods:
+    """The system zone's offset and when it next changes, answering like OffsetTable.period.
+
+    Shared by the Tk thread and the time server's thread, so the period is published as one
+    tuple: a reader sees either the old or the new one, never a mix.
+    """
+
+    def __init__(self):
+        self.invalidate()
+
+    def invalidate(self):
+        self.current = (math.inf, -math.inf, 0, "")
+
+    def period(self, now):
+        current = self.current
+        if not current[0] <= now < current[1]:
+            moment = time.localtime(now)
+            changes = local_transitions("", int(now), int(now) + LOCAL_WINDOW)
+            end = changes[0].instant if changes else int(now) + LOCAL_WINDOW
+            current = self.current = (now, end, moment.tm_gmtoff, moment.tm_zone)
+        return current
+
+
+LOCAL = LocalPeriods()
+
+
+class RelativeToLocal:
+    """%{rel_offset} / %{rel_day}: the zone's offset from local time and its date relative to local.
+
+    Both only change at an offset change or a midnight in either zone. The text is computed
+    once and kept until that instant, which next_change() hands to the tick scheduler.
+    """
+
+    resolution = DAY
+
+    def __init__(self, tz_config, style="offset"):
+        tz_config = dict(DEFAULT_ZONE, **tz_config)
+        self.style = style
+        scale = ZoneRenderer.time_scale(tz_config)
+        if scale is not None:
+            self.table = scale.table
+        elif tz_config["timezone"] == "local":
+            self.table = None
+        else:
+            self.table = OffsetTable(pytz.timezone(tz_config["timezone"]))
+        self.invalidate()
+
+    def invalidate(self):
+        self.since = math.inf
+        self.until = -math.inf
+        self.text = ""
+        # A clock step can land in another local period too
+        LOCAL.invalidate()
+
+    def compute(self, now):
+        """Return (text, instant it next changes)"""
+        _, local_end, local_offset, _ = LOCAL.period(now)
+        if self.table is None:
+            zone_end, zone_offset = local_end, local_offset
+        else:
+            _, zone_end, zone_offset, _ = self.table.period(now)
+        until = min(local_end, zone_end)
+        if self.style == "offset":
+            return format_offset(zone_offset - local_offset), until
+        zone_day = (now + zone_offset) // DAY
+        local_day = (now + local_offset) // DAY
+        difference = int(zone_day - local_day)
+        midnight = min((zone_day + 1) * DAY - zone_offset, (local_day + 1) * DAY - local_offset)
+        return DAY_NAMES.get(difference, f"{difference:+d} days"), min(until, midnight)
+
+    def render(self, now):
+        if not self.since <= now < self.until:
+            self.text, self.until = self.compute(now)
+            self.since = now
+        return self.text
+
+    def next_change(self, now):
+        self.render(now)
+        return self.until
+
+    def samples(self, now):
+        if self.style == "offset":
+            return ["+00:00", "-00:00"]
+        return [*DAY_NAMES.values(), "+0 days", "-0 days"]
+
+
+register_extension("rel_offset", RelativeToLocal)
+register_extension("rel_day", lambda tz_config: RelativeToLocal(tz_config, "day"))
+
+
+def benchmark(tz_config, days=365):
+    fields = [RelativeToLocal(tz_config), RelativeToLocal(tz_config, "day")]
+    computes = 0
+    now = time.time()
+    started = time.perf_counter()
+    for tick in range(0, days * DAY, 60):
+        for field in fields:
+            since = field.since
+            field.render(now + tick)
+            computes += field.since != since
+    elapsed = time.perf_counter() - started
+    ticks = days * DAY // 60 * len(fields)
+    print(f"{tz_config['name']}: {ticks} minute renders over {days} days, {computes} recomputes, "
+          f"{elapsed / ticks * 1e9:.0f} ns per render")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show each configured zone's offset and day relative to local time")
+    parser.add_argument("--config", default="clock_config.json", help="path to clock_config.json")
+    parser.add_argument("--bench", action="store_true", help="count recomputes over a year of minute ticks")
+    args = parser.parse_args(argv)
+    config = load_config_file(args.config)
+    now = time.time()
+    for tz_config in config["timezones"]:
+        if args.bench:
+            benchmark(tz_config)
+            continue
+        offset = RelativeToLocal(tz_config)
+        day = RelativeToLocal(tz_config, "day")
+        print(f"{tz_config['name']}: {offset.render(now)} {day.render(now)}, "
+              f"until {time.strftime('%Y-%m-%d %H:%M', time.localtime(min(offset.until, day.until)))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
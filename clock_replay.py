@@ -0,0 +1,111 @@
+import argparse
+import sys
+import time
+from datetime import datetime
+
+import pytz
+
+from clock_engine import DEFAULT_ZONE, ClockHealth, ClockRenderer, VirtualClock, load_config_file
+
+# Padded directives (%-H on glibc, %#H on Windows) must not hide what a format shows from the scheduler
+FLAG = "#" if sys.platform == "win32" else "-"
+FLAGGED_FORMATS = (f"%{FLAG}H:%{FLAG}M:%{FLAG}S", f"%{FLAG}I:%M %p\n%a %{FLAG}d %b")
+
+
+def flagged_config():
+    return {"timezones": [
+        dict(DEFAULT_ZONE, name=f"{timezone} {fmt!r}", timezone=timezone, datetime_format=fmt)
+        for fmt in FLAGGED_FORMATS for timezone in ("local", "America/New_York")
+    ]}
+
+
+def reference_render(zone, now):
+    # The uncached, one-strftime-per-zone rendering the app used to do
+    if zone.tz is None:
+        return time.strftime(zone.format, time.localtime(now))
+    return datetime.fromtimestamp(now, zone.tz).strftime(zone.format)
+
+
+def replay(config, start, ticks, verify=True, clock=None):
+    """Drive the renderer through `ticks` boundary-scheduled ticks on a virtual clock.
+
+    Returns (ticks, elapsed seconds, mismatches, missed changes, virtual seconds covered).
+    A missed change is a zone whose text differs half way to the next scheduled tick,
+    i.e. the scheduler slept through a visible change.
+    """
+    clock = clock or VirtualClock(start)
+    renderer = ClockRenderer(config, clock)
+    mismatches = missed = 0
+    started = time.perf_counter()
+    for _ in range(ticks):
+        now = clock.time()
+        texts = renderer.render_all(now)
+        boundary = renderer.next_boundary(now)
+        if verify:
+            middle = (now + boundary) / 2
+            for zone, (name, text) in zip(renderer.zones, texts):
+                if text != reference_render(zone, now):
+                    mismatches += 1
+                if reference_render(zone, middle) != text:
+                    missed += 1
+        clock.advance(boundary - now)
+    elapsed = time.perf_counter() - started
+    return ticks, elapsed, mismatches, missed, clock.time() - start
+
+
+def check_health(start):
+    """Run ClockHealth through a normal tick, a late tick, steps and a suspend on a virtual clock.
+
+    Returns a list of (case, expected, got) for every case it got wrong.
+    """
+    clock = VirtualClock(start)
+    health = ClockHealth(clock)
+    cases = [
+        ("tick", lambda: clock.advance(1), None),
+        ("late tick", lambda: clock.advance(2.5), None),
+        ("step forward", lambda: (clock.advance(1), clock.step(30)), ClockHealth.STEP),
+        ("step back", lambda: (clock.advance(1), clock.step(-30)), ClockHealth.STEP),
+        ("suspend", lambda: clock.advance(3600), ClockHealth.SUSPEND),
+        ("tick after resume", lambda: clock.advance(1), None),
+    ]
+    failures = []
+    for case, move, expected in cases:
+        move()
+        got = health.check(1)
+        if got != expected:
+            failures.append((case, expected, got))
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay clock ticks on a virtual clock to check and time the renderer")
+    parser.add_argument("--config", default="clock_config.json", help="path to clock_config.json")
+    parser.add_argument("--start", default="2026-03-07T00:00:00",
+                        help="UTC start instant (default spans the US DST change)")
+    parser.add_argument("--ticks", type=int, default=1000000, help="number of ticks to replay")
+    parser.add_argument("--no-verify", action="store_true", help="only measure throughput")
+    parser.add_argument("--health", action="store_true", help="check step/suspend detection instead of rendering")
+    args = parser.parse_args(argv)
+
+    start = pytz.utc.localize(datetime.fromisoformat(args.start)).timestamp()
+    if args.health:
+        failures = check_health(start)
+        for case, expected, got in failures:
+            print(f"{case}: expected {expected}, got {got}")
+        print(f"clock health: {len(failures)} failures")
+        return 1 if failures else 0
+    config = load_config_file(args.config)
+    ticks, elapsed, mismatches, missed, covered = replay(config, start, args.ticks, not args.no_verify)
+    print(f"{ticks} ticks x {len(config['timezones'])} zones covering {covered / 86400:.1f} virtual days "
+          f"in {elapsed:.2f}s: {ticks / elapsed:.0f} ticks/s")
+    if not args.no_verify:
+        print(f"{mismatches} mismatches against direct strftime, {missed} changes slept through")
+        _, _, flagged_mismatches, flagged_missed, _ = replay(flagged_config(), start, min(args.ticks, 20000))
+        print(f"flagged formats: {flagged_mismatches} mismatches, {flagged_missed} changes slept through")
+        mismatches += flagged_mismatches
+        missed += flagged_missed
+    return 1 if mismatches or missed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
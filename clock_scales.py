@@ -0,0 +1,122 @@
+import argparse
+import bisect
+import calendar
+import math
+import sys
+import time
+
+from clock_engine import ZoneRenderer, register_extension, register_time_scale
+
+# TAI - UTC in whole seconds, from the UTC instant each value took effect (IERS Bulletin C).
+# No leap second has been scheduled since 2017; a new one only needs a row here.
+LEAP_SECONDS = [
+    ((1972, 1, 1), 10), ((1972, 7, 1), 11), ((1973, 1, 1), 12), ((1974, 1, 1), 13),
+    ((1975, 1, 1), 14), ((1976, 1, 1), 15), ((1977, 1, 1), 16), ((1978, 1, 1), 17),
+    ((1979, 1, 1), 18), ((1980, 1, 1), 19), ((1981, 7, 1), 20), ((1982, 7, 1), 21),
+    ((1983, 7, 1), 22), ((1985, 7, 1), 23), ((1988, 1, 1), 24), ((1990, 1, 1), 25),
+    ((1991, 1, 1), 26), ((1992, 7, 1), 27), ((1993, 7, 1), 28), ((1994, 7, 1), 29),
+    ((1996, 1, 1), 30), ((1997, 7, 1), 31), ((1999, 1, 1), 32), ((2006, 1, 1), 33),
+    ((2009, 1, 1), 34), ((2012, 7, 1), 35), ((2015, 7, 1), 36), ((2017, 1, 1), 37)
+]
+LEAP_STARTS = [calendar.timegm(day + (0, 0, 0)) for day, _ in LEAP_SECONDS]
+LEAP_OFFSETS = [offset for _, offset in LEAP_SECONDS]
+# GPS time was TAI - 19 s at its 1980-01-06 epoch and has no leap seconds since
+GPS_TAI_OFFSET = -19
+GPS_EPOCH = calendar.timegm((1980, 1, 6, 0, 0, 0))
+
+
+def tai_offset(now):
+    """TAI - UTC at a UTC instant (before 1972 the table's first value is used)"""
+    return LEAP_OFFSETS[max(0, bisect.bisect_right(LEAP_STARTS, now) - 1)]
+
+
+class LeapTable:
+    """A time scale's offset from UTC as periods between leap seconds, shaped like OffsetTable"""
+
+    def __init__(self, name, shift=0):
+        self.name = name
+        self.shift = shift
+        self.starts = [-math.inf] + LEAP_STARTS[1:]
+        self.offsets = [offset + shift for offset in LEAP_OFFSETS]
+
+    def period(self, now):
+        index = bisect.bisect_right(self.starts, now) - 1
+        end = self.starts[index + 1] if index + 1 < len(self.starts) else math.inf
+        return self.starts[index], end, self.offsets[index], self.name
+
+    def utcoffset(self, now):
+        return self.offsets[bisect.bisect_right(self.starts, now) - 1]
+
+
+class TimeScale:
+    """A uniform time scale rendered as calendar time, e.g. TAI or GPS"""
+
+    def __init__(self, name, shift=0, epoch=0):
+        self.zone = name
+        self.table = LeapTable(name, shift)
+        # Seconds-since-epoch counters for %{epoch} count from here (in the scale's own time)
+        self.epoch = epoch
+
+    def __str__(self):
+        return self.zone
+
+
+register_time_scale("tai", lambda: TimeScale("TAI"))
+register_time_scale("gps", lambda: TimeScale("GPS", GPS_TAI_OFFSET, GPS_EPOCH))
+
+
+class EpochCounter:
+    """%{epoch} / %{epoch_ms}: seconds or milliseconds since the zone's scale epoch.
+
+    The scale offset only changes at leap seconds, so a tick is one integer format.
+    """
+
+    resolution = 1
+
+    def __init__(self, tz_config, scale=1):
+        self.scale = scale
+        # Millisecond counters change every frame; the app's frame limiter paces them
+        self.animated = scale != 1
+        self.table = None
+        self.epoch = 0
+        renderer_scale = ZoneRenderer.time_scale(tz_config)
+        if renderer_scale is not None:
+            self.table = renderer_scale.table
+            self.epoch = renderer_scale.epoch
+        self.invalidate()
+
+    def invalidate(self):
+        self.start = math.inf
+        self.end = -math.inf
+        self.shift = 0
+
+    def render(self, now):
+        if self.table is not None and not self.start <= now < self.end:
+            self.start, self.end, offset, _ = self.table.period(now)
+            self.shift = offset - self.epoch
+        if self.scale == 1:
+            return str(int(now) + self.shift)
+        return str(int(now * self.scale) + self.shift * self.scale)
+
+
+register_extension("epoch", EpochCounter)
+register_extension("epoch_ms", lambda tz_config: EpochCounter(tz_config, 1000))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show UTC, TAI and GPS time and the leap-second offset")
+    parser.add_argument("--at", type=float, help="Unix time to show (default now)")
+    args = parser.parse_args(argv)
+    now = time.time() if args.at is None else args.at
+    for scale in ("utc", "tai", "gps"):
+        renderer = ZoneRenderer({
+            "name": scale.upper(), "timezone": "UTC", "scale": scale,
+            "datetime_format": "%Y-%m-%d %H:%M:%S %Z  %{epoch}", "locale": ""
+        })
+        print(f"{scale.upper():>4}: {renderer.render(now)}")
+    print(f"TAI - UTC = {tai_offset(now)} s, GPS - UTC = {tai_offset(now) + GPS_TAI_OFFSET} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+import argparse
+import http.client
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from clock_engine import SYSTEM_CLOCK, ClockRenderer, format_offset, load_config_file
+
+
+def remove_socket(path):
+    """Unlink a socket left at `path`; any other file there is an error and is never deleted"""
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{path} exists and is not a socket; choose another server.unix_socket")
+    os.remove(path)
+
+
+class ResponseCache:
+    """JSON body for the configured zones, rebuilt at most once per second"""
+
+    def __init__(self, renderer, clock=SYSTEM_CLOCK):
+        self.lock = threading.Lock()
+        self.clock = clock
+        self.renderer = renderer
+        self.second = None
+        self.body = b""
+
+    def set_renderer(self, renderer):
+        with self.lock:
+            self.renderer = renderer
+            self.second = None
+
+    def build(self, now):
+        zones = []
+        for zone, (name, text) in zip(self.renderer.zones, self.renderer.render_all(now)):
+            offset = zone.utcoffset(now)
+            zones.append({
+                "name": name,
+                "timezone": zone.config["timezone"],
+                "text": text,
+                "offset_seconds": offset,
+                "offset": format_offset(offset)
+            })
+        return json.dumps({"time": int(now), "zones": zones}, ensure_ascii=False).encode("utf-8")
+
+    def get(self):
+        now = self.clock.time()
+        second = int(now)
+        # Unlocked fast path: every request in the same second shares the same bytes object
+        if second != self.second:
+            with self.lock:
+                if second != self.second:
+                    self.body = self.build(now)
+                    self.second = second
+        return self.body
+
+
+class ClockRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; without this keep-alive clients stall on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if self.path not in ("/", "/zones"):
+            self.send_error(404)
+            return
+        body = self.server.cache.get()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Unix socket peers have no address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ClockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class ClockUnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+else:
+    ClockUnixServer = None
+
+
+class ClockServer:
+    """Serves the zone JSON over localhost HTTP or a Unix socket on a background thread"""
+
+    def __init__(self, config, renderer=None, clock=SYSTEM_CLOCK):
+        settings = config["server"]
+        self.cache = ResponseCache(renderer or ClockRenderer(config, clock), clock)
+        self.unix_socket = settings.get("unix_socket") or ""
+        if self.unix_socket:
+            if ClockUnixServer is None:
+                raise OSError("Unix sockets are not supported on this platform")
+            remove_socket(self.unix_socket)
+            self.httpd = ClockUnixServer(self.unix_socket, ClockRequestHandler)
+        else:
+            self.httpd = ClockHTTPServer((settings["host"], settings["port"]), ClockRequestHandler)
+        self.httpd.cache = self.cache
+        self.thread = None
+
+    @property
+    def address(self):
+        return self.httpd.server_address
+
+    def set_renderer(self, renderer):
+        self.cache.set_renderer(renderer)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.close()
+
+    def close(self):
+        self.httpd.server_close()
+        if self.unix_socket:
+            try:
+                remove_socket(self.unix_socket)
+            except OSError:
+                pass
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=5):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+def connect(address):
+    if isinstance(address, str):
+        return UnixHTTPConnection(address)
+    return http.client.HTTPConnection(address[0], address[1], timeout=5)
+
+
+def query(address):
+    """Fetch the zone JSON from a running server; address is (host, port) or a socket path"""
+    connection = connect(address)
+    try:
+        connection.request("GET", "/zones")
+        return json.loads(connection.getresponse().read())
+    finally:
+        connection.close()
+
+
+def benchmark(config, clients=4, requests_per_client=2000):
+    config = dict(config, server=dict(config["server"], port=0))
+    server = ClockServer(config).start()
+    errors = []
+
+    def client():
+        connection = connect(server.address)
+        try:
+            for _ in range(requests_per_client):
+                connection.request("GET", "/zones")
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    errors.append(response.status)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    server.stop()
+    total = clients * requests_per_client
+    print(f"{total} requests over {clients} keep-alive clients in {elapsed:.2f}s: "
+          f"{total / elapsed:.0f} req/s, {len(errors)} errors")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the configured clocks as JSON on localhost")
+    parser.add_argument("--config", default="clock_config.json", help="path to clock_config.json")
+    parser.add_argument("--host", help="override server.host")
+    parser.add_argument("--port", type=int, help="override server.port")
+    parser.add_argument("--unix-socket", help="serve on this Unix socket path instead of TCP")
+    parser.add_argument("--bench", action="store_true", help="measure throughput with local clients and exit")
+    args = parser.parse_args(argv)
+
+    config = load_config_file(args.config)
+    if args.host:
+        config["server"]["host"] = args.host
+    if args.port is not None:
+        config["server"]["port"] = args.port
+    if args.unix_socket:
+        config["server"]["unix_socket"] = args.unix_socket
+    if args.bench:
+        benchmark(config)
+        return 0
+
+    server = ClockServer(config)
+    print(f"Serving clock JSON on {server.address}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+import argparse
+import mmap
+import multiprocessing
+import os
+import struct
+import sys
+import tempfile
+import time
+
+# Fixed layout, little endian:
+#   header (32 bytes): magic, version, slot count, sequence, slot size, zone count, timestamp
+#   slots: name length, text length, name bytes, text bytes
+# The sequence number is a seqlock: odd while the writer is updating, even when consistent.
+MAGIC = b"TCLK"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQHHxxxxd")
+SEQ = struct.Struct("<Q")
+SEQ_OFFSET = 8
+LENGTH = struct.Struct("<H")
+ZONES_OFFSET = 18
+STAMP = struct.Struct("<d")
+STAMP_OFFSET = 24
+LENGTHS = struct.Struct("<HH")
+NAME_SIZE = 64
+TEXT_SIZE = 192
+SLOT_SIZE = LENGTHS.size + NAME_SIZE + TEXT_SIZE
+DEFAULT_SLOTS = 16
+
+
+def default_path():
+    return os.path.join(tempfile.gettempdir(), "tray_clock_tick.bin")
+
+
+def encode(text, size):
+    data = text.encode("utf-8")
+    if len(data) > size:
+        # Cut on a character boundary so readers never see half a code point
+        data = data[:size].decode("utf-8", "ignore").encode("utf-8")
+    return data
+
+
+class TickBufferWriter:
+    """Publishes rendered zone strings into a memory-mapped file once per tick"""
+
+    def __init__(self, path=None, slot_count=DEFAULT_SLOTS):
+        self.path = path or default_path()
+        self.slot_count = slot_count
+        size = HEADER.size + slot_count * SLOT_SIZE
+        # Readers may still have the file mapped (across an app restart, say): truncating it would
+        # fail on Windows and fault their reads on Linux, so it is only created or grown
+        try:
+            self.file = open(self.path, "r+b")
+        except FileNotFoundError:
+            self.file = open(self.path, "w+b")
+        if os.fstat(self.file.fileno()).st_size < size:
+            self.file.truncate(size)
+        self.map = mmap.mmap(self.file.fileno(), size)
+        magic, _, _, seq, _, _, _ = HEADER.unpack_from(self.map)
+        # Carry on from the old sequence so an attached reader sees a change, never a rewind
+        self.seq = seq + seq % 2 if magic == MAGIC else 0
+        self.begin()
+        HEADER.pack_into(self.map, 0, MAGIC, VERSION, slot_count, self.seq, SLOT_SIZE, 0, 0.0)
+        self.end()
+        self.texts = [None] * slot_count
+        self.zone_count = 0
+
+    def slot_offset(self, index):
+        return HEADER.size + index * SLOT_SIZE
+
+    def begin(self):
+        self.seq += 1
+        SEQ.pack_into(self.map, SEQ_OFFSET, self.seq)
+
+    def end(self):
+        self.seq += 1
+        SEQ.pack_into(self.map, SEQ_OFFSET, self.seq)
+
+    def set_names(self, names):
+        names = list(names)[:self.slot_count]
+        self.begin()
+        for index, name in enumerate(names):
+            data = encode(name, NAME_SIZE)
+            offset = self.slot_offset(index)
+            LENGTHS.pack_into(self.map, offset, len(data), 0)
+            start = offset + LENGTHS.size
+            self.map[start:start + len(data)] = data
+        self.zone_count = len(names)
+        LENGTH.pack_into(self.map, ZONES_OFFSET, self.zone_count)
+        self.texts = [None] * self.slot_count
+        self.end()
+
+    def publish(self, now, texts):
+        self.begin()
+        for index in range(min(len(texts), self.zone_count)):
+            text = texts[index]
+            # Unchanged slots are left alone; most ticks only touch the seconds field of one zone
+            if text == self.texts[index]:
+                continue
+            self.texts[index] = text
+            data = encode(text, TEXT_SIZE)
+            offset = self.slot_offset(index)
+            LENGTH.pack_into(self.map, offset + 2, len(data))
+            start = offset + LENGTHS.size + NAME_SIZE
+            self.map[start:start + len(data)] = data
+        STAMP.pack_into(self.map, STAMP_OFFSET, now)
+        self.end()
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+class TickBufferReader:
+    """Reads consistent snapshots from a TickBufferWriter file (seqlock retry loop)"""
+
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        self.file = open(self.path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.slot_count, _, slot_size, _, _ = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION or slot_size != SLOT_SIZE:
+            raise ValueError(f"{self.path} is not a tick buffer (version {VERSION})")
+
+    def sequence(self):
+        return SEQ.unpack_from(self.map, SEQ_OFFSET)[0]
+
+    def read_raw(self):
+        """Return (sequence, consistent copy of the mapping) without decoding"""
+        spins = 0
+        while True:
+            before = SEQ.unpack_from(self.map, SEQ_OFFSET)[0]
+            if not before & 1:
+                data = self.map[:]
+                if SEQ.unpack_from(self.map, SEQ_OFFSET)[0] == before:
+                    return before, data
+            spins += 1
+            if spins % 64 == 0:
+                time.sleep(0)
+
+    def read(self):
+        """Return (sequence, timestamp, [(name, text), ...])"""
+        seq, data = self.read_raw()
+        zone_count = LENGTH.unpack_from(data, ZONES_OFFSET)[0]
+        timestamp = STAMP.unpack_from(data, STAMP_OFFSET)[0]
+        zones = []
+        for index in range(zone_count):
+            offset = HEADER.size + index * SLOT_SIZE
+            name_length, text_length = LENGTHS.unpack_from(data, offset)
+            start = offset + LENGTHS.size
+            name = data[start:start + name_length].decode("utf-8")
+            text = data[start + NAME_SIZE:start + NAME_SIZE + text_length].decode("utf-8")
+            zones.append((name, text))
+        return seq, timestamp, zones
+
+    def read_if_changed(self, last_seq):
+        """Return None while the sequence is unchanged, so idle polling costs one 8-byte read"""
+        if self.sequence() == last_seq:
+            return None
+        return self.read()
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+def bench_writer(path, names, ready, stop):
+    writer = TickBufferWriter(path)
+    writer.set_names(names)
+    ready.set()
+    count = 0
+    while not stop.is_set():
+        count += 1
+        # Every slot carries the same counter so a torn read is detectable
+        writer.publish(time.time(), [f"{name} {count:012d}" for name in names])
+    writer.close()
+
+
+def benchmark(path=None, duration=2.0, zones=8):
+    path = path or os.path.join(tempfile.gettempdir(), "tray_clock_bench.bin")
+    names = [f"zone{i}" for i in range(zones)]
+    ready = multiprocessing.Event()
+    stop = multiprocessing.Event()
+    writer = multiprocessing.Process(target=bench_writer, args=(path, names, ready, stop))
+    writer.start()
+    ready.wait()
+    reader = TickBufferReader(path)
+    reads = torn = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        _, _, snapshot = reader.read()
+        counters = {text.rsplit(" ", 1)[-1] for _, text in snapshot}
+        if len(counters) > 1:
+            torn += 1
+        reads += 1
+    stop.set()
+    writer.join()
+    reader.close()
+    os.remove(path)
+    print(f"{reads} snapshot reads of {zones} zones in {duration:.1f}s against a busy writer: "
+          f"{reads / duration:.0f} reads/s, {torn} torn")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read the tray clock's shared tick buffer")
+    parser.add_argument("--path", help="buffer file (default: tray_clock_tick.bin in the temp dir)")
+    parser.add_argument("--follow", action="store_true", help="print every new snapshot")
+    parser.add_argument("--bench", action="store_true", help="measure reader throughput against a writer process")
+    args = parser.parse_args(argv)
+    if args.bench:
+        benchmark(args.path)
+        return 0
+    reader = TickBufferReader(args.path)
+    last = None
+    try:
+        while True:
+            snapshot = reader.read_if_changed(last)
+            if snapshot:
+                last, timestamp, zones = snapshot
+                print(" | ".join(f"{name}: {' '.join(text.split())}" for name, text in zones), flush=True)
+            if not args.follow:
+                break
+            time.sleep(0.05)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+import argparse
+import calendar
+import math
+import sys
+import time
+from datetime import date, timedelta
+
+import pytz
+
+from clock_engine import DEFAULT_ZONE, OffsetTable, load_config_file, register_extension
+
+# Sunrise equation (the NOAA/Meeus simplification), good to about a minute at non-polar latitudes
+J2000 = 2451545.0
+UNIX_EPOCH_JD = 2440587.5
+EPOCH_DAY = date(2000, 1, 1)
+OBLIQUITY = math.radians(23.4397)
+# Refraction plus the sun's radius: the upper limb touches the horizon at -0.833 degrees
+HORIZON = math.sin(math.radians(-0.833))
+POLAR_DAY = "polar day"
+POLAR_NIGHT = "polar night"
+
+
+def sun_events(latitude, longitude, day_number):
+    """(sunrise, sunset) as Unix times for the solar day `day_number` days after 2000-01-01.
+
+    Returns POLAR_DAY or POLAR_NIGHT instead when the sun does not cross the horizon.
+    """
+    mean_noon = day_number - longitude / 360
+    anomaly = math.radians((357.5291 + 0.98560028 * mean_noon) % 360)
+    center = 1.9148 * math.sin(anomaly) + 0.02 * math.sin(2 * anomaly) + 0.0003 * math.sin(3 * anomaly)
+    ecliptic = math.radians((math.degrees(anomaly) + center + 180 + 102.9372) % 360)
+    transit = J2000 + mean_noon + 0.0053 * math.sin(anomaly) - 0.0069 * math.sin(2 * ecliptic)
+    declination = math.asin(math.sin(ecliptic) * math.sin(OBLIQUITY))
+    phi = math.radians(latitude)
+    cos_hour = (HORIZON - math.sin(phi) * math.sin(declination)) / (math.cos(phi) * math.cos(declination))
+    if cos_hour < -1:
+        return POLAR_DAY
+    if cos_hour > 1:
+        return POLAR_NIGHT
+    half = math.degrees(math.acos(cos_hour)) / 360
+    return (transit - half - UNIX_EPOCH_JD) * 86400, (transit + half - UNIX_EPOCH_JD) * 86400
+
+
+def year_table(latitude, longitude, year):
+    """sun_events for every day of `year`, with the per-year constants hoisted out of the loop.
+
+    Still one day at a time in plain Python; daylight_bits walks it for each year a range touches.
+    """
+    first = (date(year, 1, 1) - EPOCH_DAY).days
+    count = 366 if calendar.isleap(year) else 365
+    sin_phi, cos_phi = math.sin(math.radians(latitude)), math.cos(math.radians(latitude))
+    sin_obliquity = math.sin(OBLIQUITY)
+    sin, acos, degrees, radians = math.sin, math.acos, math.degrees, math.radians
+    table = []
+    for day_number in range(first, first + count):
+        mean_noon = day_number - longitude / 360
+        anomaly_degrees = (357.5291 + 0.98560028 * mean_noon) % 360
+        anomaly = radians(anomaly_degrees)
+        center = 1.9148 * sin(anomaly) + 0.02 * sin(2 * anomaly) + 0.0003 * sin(3 * anomaly)
+        ecliptic = radians((anomaly_degrees + center + 282.9372) % 360)
+        transit = J2000 + mean_noon + 0.0053 * sin(anomaly) - 0.0069 * sin(2 * ecliptic)
+        sin_declination = sin(ecliptic) * sin_obliquity
+        cos_declination = math.sqrt(1 - sin_declination * sin_declination)
+        cos_hour = (HORIZON - sin_phi * sin_declination) / (cos_phi * cos_declination)
+        if cos_hour < -1:
+            table.append(POLAR_DAY)
+        elif cos_hour > 1:
+            table.append(POLAR_NIGHT)
+        else:
+            half = degrees(acos(cos_hour)) / 360
+            table.append(((transit - half - UNIX_EPOCH_JD) * 86400, (transit + half - UNIX_EPOCH_JD) * 86400))
+    return table
+
+
+def daylight_bits(latitude, longitude, start, minutes):
+    """Bitset over the minute grid from `start` (UTC seconds): bit set while the sun is up"""
+    first = date(*time.gmtime(start)[:3]) - timedelta(days=1)
+    last = date(*time.gmtime(start + minutes * 60)[:3]) + timedelta(days=1)
+    mask = 0
+    for year in range(first.year, last.year + 1):
+        year_start = (date(year, 1, 1) - EPOCH_DAY).days
+        for index, events in enumerate(year_table(latitude, longitude, year)):
+            day_start = (year_start + index) * 86400 + calendar.timegm(EPOCH_DAY.timetuple())
+            if events == POLAR_NIGHT:
+                continue
+            if events == POLAR_DAY:
+                # The whole solar day, local solar midnight to midnight
+                rise = day_start - longitude * 240
+                events = (rise, rise + 86400)
+            low = max(0, int(events[0] - start) // 60)
+            high = min(minutes, int(events[1] - start) // 60)
+            if high > low:
+                mask |= ((1 << (high - low)) - 1) << low
+    return mask
+
+
+class SunTimes:
+    """Sunrise, sunset and day/night for one zone, computed once per local day"""
+
+    resolution = 60
+
+    def __init__(self, tz_config, style="sun"):
+        tz_config = dict(DEFAULT_ZONE, **tz_config)
+        self.latitude = tz_config["latitude"]
+        self.longitude = tz_config["longitude"]
+        self.table = None if tz_config["timezone"] == "local" else OffsetTable(pytz.timezone(tz_config["timezone"]))
+        self.style = style
+        self.invalidate()
+
+    def invalidate(self):
+        self.day = None
+        self.events = None
+        self.tomorrow = None
+
+    def offset(self, now):
+        return time.localtime(now).tm_gmtoff if self.table is None else self.table.utcoffset(now)
+
+    def clock_text(self, instant):
+        return time.strftime("%H:%M", time.gmtime(instant + self.offset(instant)))
+
+    def events_for(self, now):
+        """(sunrise, sunset, sunrise text, sunset text) for the local date, or a POLAR_ marker.
+
+        The only place the solar calculation runs: once per zone per local date.
+        """
+        day = int((now + self.offset(now)) // 86400)
+        if day != self.day:
+            events = self.day_events(day)
+            if isinstance(events, tuple):
+                events += (self.clock_text(events[0]), self.clock_text(events[1]))
+            self.events = events
+            self.tomorrow = None
+            self.day = day
+        return self.events
+
+    def day_events(self, day):
+        local_date = date(1970, 1, 1) + timedelta(days=day)
+        return sun_events(self.latitude, self.longitude, (local_date - EPOCH_DAY).days)
+
+    def next_sunrise_text(self):
+        if self.tomorrow is None:
+            events = self.day_events(self.day + 1)
+            self.tomorrow = self.clock_text(events[0]) if isinstance(events, tuple) else ""
+        return self.tomorrow
+
+    def render(self, now):
+        if self.latitude is None or self.longitude is None:
+            return ""
+        events = self.events_for(now)
+        if events == POLAR_DAY:
+            return "Midnight sun" if self.style == "sun" else "--:--"
+        if events == POLAR_NIGHT:
+            return "Polar night" if self.style == "sun" else "--:--"
+        rise, sunset, rise_text, sunset_text = events
+        if self.style == "sunrise":
+            return rise_text
+        if self.style == "sunset":
+            return sunset_text
+        if rise <= now < sunset:
+            return f"Day · sunset {sunset_text}"
+        if now >= sunset:
+            rise_text = self.next_sunrise_text()
+        return f"Night · sunrise {rise_text}" if rise_text else "Night"
+
+    def samples(self, now):
+        if self.latitude is None or self.longitude is None:
+            return [""]
+        if self.style != "sun":
+            return ["00:00", "--:--"]
+        return ["Day · sunset 00:00", "Night · sunrise 00:00", "Night", "Midnight sun", "Polar night"]
+
+
+register_extension("sun", SunTimes)
+register_extension("sunrise", lambda tz_config: SunTimes(tz_config, "sunrise"))
+register_extension("sunset", lambda tz_config: SunTimes(tz_config, "sunset"))
+
+
+def benchmark(latitude=51.5, longitude=-0.13, years=10):
+    started = time.perf_counter()
+    for year in range(2026, 2026 + years):
+        year_table(latitude, longitude, year)
+    table = time.perf_counter() - started
+    started = time.perf_counter()
+    for day_number in range(years * 365):
+        sun_events(latitude, longitude, 9500 + day_number)
+    single = time.perf_counter() - started
+    zone = SunTimes({"timezone": "Europe/London", "latitude": latitude, "longitude": longitude})
+    now = time.time()
+    started = time.perf_counter()
+    for tick in range(100000):
+        zone.render(now + tick)
+    ticks = time.perf_counter() - started
+    days = years * 365
+    print(f"year_table: {table / days * 1e6:.1f} us per day, sun_events: {single / days * 1e6:.1f} us per day")
+    print(f"%{{sun}} render from the per-day cache: {ticks / 100000 * 1e6:.2f} us per tick")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sunrise and sunset for the configured zones (computed offline)")
+    parser.add_argument("--config", default="clock_config.json", help="path to clock_config.json")
+    parser.add_argument("--bench", action="store_true", help="time the year table against per-day calls, and the per-tick path")
+    args = parser.parse_args(argv)
+    if args.bench:
+        benchmark()
+        return 0
+    now = time.time()
+    for tz_config in load_config_file(args.config)["timezones"]:
+        zone = SunTimes(tz_config)
+        text = zone.render(now) or "no latitude/longitude configured"
+        print(f"{tz_config['name']}: {text}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+import argparse
+import heapq
+import itertools
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pytz
+
+from clock_engine import SYSTEM_CLOCK
+
+ALARM = "alarm"
+COUNTDOWN = "countdown"
+REMINDER = "reminder"
+
+TIMER_DEFAULTS = {
+    "name": "Timer",
+    "kind": ALARM,
+    "timezone": "local",
+    "time": "09:00",
+    "days": [0, 1, 2, 3, 4, 5, 6],
+    "target": "",
+    "interval_minutes": 60,
+    "show": True,
+    "notify": True,
+    "enabled": True
+}
+
+
+def zone_for(name):
+    if name == "local":
+        return None
+    return pytz.timezone(name)
+
+
+def local_instant(tz, naive):
+    # pytz needs localize(); a wall time skipped by DST resolves to the later offset
+    if tz is None:
+        return time.mktime(naive.timetuple())
+    return tz.normalize(tz.localize(naive, is_dst=False)).timestamp()
+
+
+def parse_clock(text):
+    parts = str(text).split(":")
+    if len(parts) < 2:
+        raise ValueError(f"time {text!r} is not HH:MM")
+    hour, minute = int(parts[0]), int(parts[1])
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"time {text!r} is out of range")
+    return hour, minute
+
+
+class Timer:
+    """One alarm, countdown or reminder; next_due() is only called when it fires or is added.
+
+    The config is checked up front: a bad entry raises ValueError here rather than when it fires.
+    """
+
+    def __init__(self, config):
+        self.config = dict(TIMER_DEFAULTS, **config)
+        self.name = self.config["name"]
+        self.kind = self.config["kind"]
+        if self.kind not in (ALARM, COUNTDOWN, REMINDER):
+            raise ValueError(f"unknown kind {self.kind!r}")
+        try:
+            self.tz = zone_for(self.config["timezone"])
+        except pytz.UnknownTimeZoneError:
+            raise ValueError(f"unknown timezone {self.config['timezone']!r}")
+        if self.kind == COUNTDOWN:
+            if not self.config["target"]:
+                raise ValueError("a countdown needs a target")
+            self.target = datetime.fromisoformat(self.config["target"])
+        else:
+            self.hour, self.minute = parse_clock(self.config["time"])
+            self.interval = max(1, int(self.config["interval_minutes"])) * 60
+            self.days = set(self.config["days"])
+            if not self.days <= set(range(7)):
+                raise ValueError(f"days {self.config['days']!r} are not weekdays 0-6")
+        self.due = None
+        self.cancelled = False
+
+    def next_due(self, now):
+        if self.kind == COUNTDOWN:
+            # A target with its own UTC offset means that instant, whatever the timer's zone
+            if self.target.tzinfo is not None:
+                target = self.target.timestamp()
+            else:
+                target = local_instant(self.tz, self.target)
+            return target if target > now else None
+        days = self.days
+        if not days:
+            return None
+        today = (datetime.fromtimestamp(now, self.tz) if self.tz else datetime.fromtimestamp(now)).replace(tzinfo=None)
+        for offset in range(8):
+            day = (today + timedelta(days=offset)).replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+            if day.weekday() not in days:
+                continue
+            due = local_instant(self.tz, day)
+            if due > now:
+                return due
+            if self.kind == REMINDER:
+                # A reminder repeats from its anchor time until that day ends, then waits for the next allowed day
+                due += ((now - due) // self.interval + 1) * self.interval
+                if due < local_instant(self.tz, day.replace(hour=0, minute=0) + timedelta(days=1)):
+                    return due
+        return None
+
+    def describe(self, now):
+        if self.kind == COUNTDOWN:
+            remaining = max(0, int(self.due - now)) if self.due else 0
+            hours, rest = divmod(remaining, 3600)
+            return f"{self.name} {hours}:{rest // 60:02d}:{rest % 60:02d}"
+        if self.due is None:
+            return self.name
+        when = datetime.fromtimestamp(self.due, self.tz) if self.tz else datetime.fromtimestamp(self.due)
+        return f"{self.name} {when.strftime('%a %H:%M')}"
+
+
+class TimerScheduler:
+    """Min-heap of timers keyed by due time; the app only wakes for the earliest one"""
+
+    def __init__(self, clock=SYSTEM_CLOCK):
+        self.clock = clock
+        self.heap = []
+        self.timers = {}
+        self.counter = itertools.count()
+
+    def add(self, timer, now=None):
+        now = self.clock.time() if now is None else now
+        if timer.name in self.timers:
+            raise ValueError(f"duplicate timer name {timer.name!r}")
+        self.timers[timer.name] = timer
+        self.push(timer, now)
+        return timer
+
+    def push(self, timer, now):
+        timer.due = timer.next_due(now)
+        if timer.due is not None:
+            heapq.heappush(self.heap, (timer.due, next(self.counter), timer))
+
+    def remove(self, name):
+        # Lazy deletion: the heap entry is skipped when it reaches the top
+        timer = self.timers.pop(name, None)
+        if timer:
+            timer.cancelled = True
+
+    def clear(self):
+        self.heap = []
+        self.timers = {}
+
+    def load(self, configs, now=None):
+        self.clear()
+        now = self.clock.time() if now is None else now
+        for config in configs:
+            if not config.get("enabled", True):
+                continue
+            try:
+                self.add(Timer(config), now)
+            except (ValueError, TypeError) as e:
+                # One bad entry must not stop the rest (or the app) from loading
+                print(f"Skipping timer {config.get('name', '?')!r}: {e}")
+
+    def discard_cancelled(self):
+        while self.heap and (self.heap[0][2].cancelled or self.heap[0][2].due != self.heap[0][0]):
+            heapq.heappop(self.heap)
+
+    def next_due(self):
+        self.discard_cancelled()
+        return self.heap[0][0] if self.heap else None
+
+    def peek(self):
+        self.discard_cancelled()
+        return self.heap[0][2] if self.heap else None
+
+    def pop_due(self, now=None):
+        """Return timers due at or before `now`, re-arming recurring ones"""
+        now = self.clock.time() if now is None else now
+        fired = []
+        while True:
+            self.discard_cancelled()
+            if not self.heap or self.heap[0][0] > now:
+                break
+            due, _, timer = heapq.heappop(self.heap)
+            fired.append(timer)
+            if timer.kind == COUNTDOWN:
+                timer.due = None
+            else:
+                self.push(timer, max(now, due))
+        return fired
+
+
+def format_elapsed(seconds, digits=2):
+    """H:MM:SS.ff, or M:SS.ff under an hour, truncated (never rounded up) to `digits` decimals"""
+    whole = int(seconds)
+    hours, rest = divmod(whole, 3600)
+    minutes, secs = divmod(rest, 60)
+    text = f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+    if digits:
+        text += "." + f"{int((seconds - whole) * 1000000):06d}"[:digits]
+    return text
+
+
+class Stopwatch:
+    """Elapsed time and laps on perf_counter, so wall-clock steps and NTP slews don't show up"""
+
+    def __init__(self, clock=SYSTEM_CLOCK):
+        self.perf_counter = clock.perf_counter
+        self.reset()
+
+    @property
+    def running(self):
+        return self.started is not None
+
+    def reset(self):
+        self.started = None
+        self.accumulated = 0.0
+        self.laps = []
+        self.lap_total = 0.0
+
+    def start(self):
+        if self.started is None:
+            self.started = self.perf_counter()
+
+    def stop(self):
+        if self.started is not None:
+            self.accumulated += self.perf_counter() - self.started
+            self.started = None
+
+    def toggle(self):
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+
+    def elapsed(self):
+        if self.started is None:
+            return self.accumulated
+        return self.accumulated + self.perf_counter() - self.started
+
+    def lap(self):
+        """Record and return the time since the previous lap"""
+        total = self.elapsed()
+        split = total - self.lap_total
+        self.lap_total = total
+        self.laps.append(split)
+        return split
+
+
+def benchmark(count=100000, seed=1):
+    rng = random.Random(seed)
+    zones = ["local", "US/Central", "Europe/London", "Asia/Kolkata", "Asia/Tokyo", "Australia/Sydney"]
+    now = time.time()
+    timers = []
+    for i in range(count):
+        kind = rng.choice([ALARM, REMINDER, COUNTDOWN])
+        config = {
+            "name": f"timer{i}",
+            "kind": kind,
+            "timezone": rng.choice(zones),
+            "time": f"{rng.randrange(24):02d}:{rng.randrange(60):02d}",
+            "interval_minutes": rng.choice([15, 30, 60, 90]),
+            "target": datetime.fromtimestamp(now + rng.randrange(1, 86400)).isoformat(timespec="seconds")
+        }
+        if kind == COUNTDOWN:
+            config["timezone"] = "local"
+        timers.append(Timer(config))
+
+    scheduler = TimerScheduler()
+    started = time.perf_counter()
+    for timer in timers:
+        scheduler.add(timer, now)
+    loaded = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(100000):
+        scheduler.next_due()
+    lookups = time.perf_counter() - started
+
+    # Fire everything due over the next hour, one simulated wakeup per due instant
+    started = time.perf_counter()
+    fired = wakeups = 0
+    horizon = now + 3600
+    while True:
+        due = scheduler.next_due()
+        if due is None or due > horizon:
+            break
+        fired += len(scheduler.pop_due(due))
+        wakeups += 1
+    firing = time.perf_counter() - started
+    print(f"{count} timers scheduled in {loaded:.2f}s ({loaded / count * 1e6:.1f} us each)")
+    print(f"next_due: {lookups / 100000 * 1e9:.0f} ns per call")
+    print(f"{fired} timers fired over a simulated hour in {wakeups} wakeups, {firing:.2f}s "
+          f"({firing / max(fired, 1) * 1e6:.1f} us per fire incl. re-arm)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the alarm/countdown/reminder scheduler")
+    parser.add_argument("--count", type=int, default=100000, help="number of timers to schedule")
+    args = parser.parse_args(argv)
+    benchmark(args.count)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())